@@ -0,0 +1,131 @@
+"""
+Module bench_decode.py
+Benchmark du décodage : image complète (Image.open + crop) contre décodage paresseux (LazyImage).
+
+Pour chaque screenshot du dossier, on reproduit ce que la pipeline décode avant le premier OCR :
+test Split View pour les iPad, puis crop 'tight' de la cascade (zone de get_crop_box).
+On mesure le temps (meilleur de N répétitions), la mémoire des pixels décodés (largeur x lignes
+décodées x canaux : c'est le tampon alloué par Pillow, invisible pour tracemalloc) et on vérifie
+que les deux crops sont identiques au pixel près.
+Les captures iOS natives sont des PNG (pas d'aperçu draft) : chaque screenshot iPad qui n'est pas un PNG
+est aussi mesuré en copie PNG sans perte, écrite dans un dossier temporaire.
+
+Usage :
+    python bench_decode.py [DOSSIER] [--repeat N]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+
+from detect_source_type import analyze_image
+from lazy_image import LazyImage
+from split_screen import split_panes
+from where_to_crop import get_crop_box
+
+DEFAULT_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "screenshots")
+
+
+def _eager(path, device_info, box):
+    img = Image.open(path)
+    img.load()
+    if device_info["device"].startswith("iPad"):
+        split_panes(img)
+    return img.crop(box), img.size[1]
+
+
+def _lazy(path, device_info, box):
+    img = LazyImage(path)
+    if device_info["device"].startswith("iPad"):
+        split_panes(img)
+    crop = img.crop(box)
+    return crop, img.decoded_rows
+
+
+def _best_time(func, repeat, *args):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def bench_image(path, repeat=5):
+    """
+    Mesure décodage complet et paresseux sur une image.
+
+    Returns:
+        dict ou None: Temps, Mo de pixels décodés et égalité des crops ; None si l'image est ignorée.
+    """
+    # Les logs de la détection ne font pas partie de la mesure
+    with contextlib.redirect_stdout(io.StringIO()):
+        info = analyze_image(path)
+    if info.get("kind") == "photo" or info["device"] == "unknown":
+        return None
+    device_info = dict(info, orientation=info["orientation"].replace("_split", ""))
+    with Image.open(path) as im:
+        (w, h), bands = im.size, len(im.getbands())
+        box = get_crop_box(im, os.path.basename(path), device_type=device_info) or (0, 0, w, h)
+    eager_s, (eager_crop, eager_rows) = _best_time(_eager, repeat, path, device_info, box)
+    lazy_s, (lazy_crop, lazy_rows) = _best_time(_lazy, repeat, path, device_info, box)
+    return {
+        "image": os.path.basename(path),
+        "size": f"{w}x{h}",
+        "eager_ms": eager_s * 1000,
+        "lazy_ms": lazy_s * 1000,
+        "eager_mb": w * eager_rows * bands / 1e6,
+        "lazy_mb": w * lazy_rows * bands / 1e6,
+        "same_crop": np.array_equal(np.asarray(eager_crop), np.asarray(lazy_crop)),
+    }
+
+
+def _ipad_png_copies(paths, folder):
+    # Copie PNG sans perte des screenshots iPad (JPEG) : même contenu, décodage PNG
+    copies = []
+    for path in paths:
+        if path.lower().endswith(".png"):
+            continue
+        with contextlib.redirect_stdout(io.StringIO()):
+            info = analyze_image(path)
+        if info.get("kind") != "photo" and info["device"].startswith("iPad"):
+            copy = os.path.join(folder, os.path.splitext(os.path.basename(path))[0] + " (copie).png")
+            with Image.open(path) as im:
+                im.save(copy)
+            copies.append(copy)
+    return copies
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark décodage complet vs décodage paresseux.")
+    parser.add_argument("folder", nargs="?", default=DEFAULT_FOLDER, help="dossier de screenshots (défaut : screenshots/)")
+    parser.add_argument("--repeat", type=int, default=5, help="répétitions par image (meilleur temps gardé)")
+    args = parser.parse_args(argv)
+
+    paths = [os.path.join(args.folder, f) for f in sorted(os.listdir(args.folder)) if f.lower().endswith(('.png', '.jpg', '.jpeg'))]
+    with tempfile.TemporaryDirectory(prefix="bench_decode_") as tmp:
+        paths += _ipad_png_copies(paths, tmp)
+        rows = [r for r in (bench_image(p, args.repeat) for p in paths) if r]
+    print(f"{'image':<24} {'taille':<10} {'complet':>9} {'paresseux':>10} {'Mo complet':>11} {'Mo paresseux':>13}  crop")
+    for r in rows:
+        print(f"{r['image']:<24} {r['size']:<10} {r['eager_ms']:>7.1f}ms {r['lazy_ms']:>8.1f}ms "
+              f"{r['eager_mb']:>11.1f} {r['lazy_mb']:>13.1f}  {'identique' if r['same_crop'] else 'DIFFÉRENT'}")
+    if not rows:
+        print("Aucune image supportée.")
+        return 1
+    eager_ms, lazy_ms = sum(r["eager_ms"] for r in rows), sum(r["lazy_ms"] for r in rows)
+    eager_mb, lazy_mb = sum(r["eager_mb"] for r in rows), sum(r["lazy_mb"] for r in rows)
+    print(f"\nTotal : {eager_ms:.1f}ms → {lazy_ms:.1f}ms (x{eager_ms / lazy_ms:.1f}), "
+          f"pixels décodés {eager_mb:.1f} Mo → {lazy_mb:.1f} Mo (x{eager_mb / lazy_mb:.1f})")
+    return 0 if all(r["same_crop"] for r in rows) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
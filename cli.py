@@ -0,0 +1,181 @@
+"""
+Module cli.py
+Point d'entrée unique (Docker, Makefile, job runner) de la pipeline, avec une sous-commande par étape :
+
+    python cli.py detect   DOSSIER [--output CSV] [--workers N]
+    python cli.py ocr      DOSSIER [--output CSV] [--workers N]
+    python cli.py search   CSV_OCR [--output CSV] [--workers N] [--backends api,scraper,catalog=JSON]
+    python cli.py pipeline DOSSIER [--output CSV] [--workers N] [--backends ...]
+    python cli.py serve    [--host H] [--port P] [--workers N] [--batch-size N] [--max-pending N]
+                           [--stub-catalog JSON] [--backends ...]
+    python cli.py history  {runs,devices,sources,songs} [--db BASE] [--limit N] [--run ID]
+
+Par défaut, une nouvelle exécution ne refait que l'étape touchée (cache eval_cache.db, voir eval_cache.py) ;
+--no-cache recalcule tout.
+--backends (défaut : 'api') : backends de recherche interrogés en parallèle, le premier résultat
+valide gagne ('api' = YouTube Data API, 'scraper' = youtube-search-python, 'catalog=JSON' = catalogue local).
+
+Les dépendances lourdes (pytesseract, numpy/cv2, googleapiclient) ne sont importées que
+par la sous-commande qui en a besoin : 'detect' démarre sans charger la pile OCR ni l'API.
+"""
+
+import argparse
+import csv
+import os
+import sys
+
+
+def _require_api_key():
+    # Récupère la clé API YouTube depuis les variables d'environnement
+    api_key = os.environ.get("YT_API_KEY")
+    if not api_key:
+        print("Erreur : Variable d'environnement YT_API_KEY absente.")
+        sys.exit(1)
+    return api_key
+
+
+def _search_fn(args, api_key=None):
+    # Recherche par défaut (YouTube Data API seule) : pas de fan-out, comportement historique
+    if args.backends == "api":
+        return None
+    from search_backends import HedgedSearch, build_backends
+    cache = None
+    if not getattr(args, "no_cache", False):
+        # Réponses brutes des backends réseau gardées comme pour l'API seule (RawCachedSearch)
+        from eval_cache import EvalCache
+        cache = EvalCache(EVAL_CACHE)
+    return HedgedSearch(build_backends(args.backends, api_key), cache=cache)
+
+
+def _backends_api_key(args):
+    # La clé API n'est exigée que si le backend 'api' est utilisé
+    return _require_api_key() if "api" in args.backends.split(",") else None
+
+
+def _print_result(rows):
+    # Affiche chaque résultat dès qu'il est prêt (ordre de fin de traitement, pas l'ordre du CSV)
+    for row in rows:
+        print(f"[RÉSULTAT] {row['image']} → {row.get('youtube_url') or row['extracted_text']!r}", flush=True)
+
+
+def cmd_detect(args):
+    """Détection device/orientation/source (lecture des en-têtes uniquement)."""
+    from detect_source_type import analyze_folder
+    res = analyze_folder(args.input, workers=args.workers)
+    with open(args.output, "w", newline='', encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["filename", "type"])
+        writer.writeheader()
+        writer.writerows(res)
+    print(f"\nAnalyse terminée. Résultats enregistrés dans {args.output}")
+
+
+def cmd_ocr(args):
+    """Détection + OCR (cascade de crops), sans recherche."""
+    from main import run_ocr_stage
+    run_ocr_stage(args.input, output_csv=args.output, workers=args.workers, on_result=_print_result,
+                  cache_db=None if args.no_cache else EVAL_CACHE)
+    print(f"\nOCR terminé. Résultats enregistrés dans {args.output}")
+
+
+def cmd_search(args):
+    """Recherche YouTube à partir d'un CSV produit par la sous-commande 'ocr'."""
+    api_key = _backends_api_key(args)
+    from search_stage import run_search_stage
+    run_search_stage(args.input, output_csv=args.output, api_key=api_key, workers=args.workers,
+                     search_fn=_search_fn(args, api_key), cache_db=None if args.no_cache else EVAL_CACHE)
+    print(f"\nRecherche terminée. Résultats enregistrés dans {args.output}")
+
+
+def cmd_pipeline(args):
+    """Pipeline complète : détection, OCR, recherche, CSV + logs."""
+    api_key = _backends_api_key(args)
+    from main import run_pipeline
+    run_pipeline(args.input, output_csv=args.output, api_key=api_key, workers=args.workers, on_result=_print_result,
+                 search_fn=_search_fn(args, api_key), cache_db=None if args.no_cache else EVAL_CACHE)
+
+
+def cmd_serve(args):
+    """Service HTTP : POST /search (image) → résultat YouTube, requêtes regroupées en lots."""
+    search_fn, api_key = None, None
+    if args.stub_catalog:
+        # Recherche simulée sur un catalogue local (format de golden_corpus.json) : pas de clé API
+        from regression_harness import load_corpus, make_stub_search
+        search_fn = make_stub_search(load_corpus(args.stub_catalog))
+    else:
+        api_key = _backends_api_key(args)
+        search_fn = _search_fn(args, api_key)
+    from http_service import serve
+    serve(args.host, args.port, api_key=api_key, search_fn=search_fn, workers=args.workers,
+          batch_size=args.batch_size, batch_wait=args.batch_wait, max_pending=args.max_pending)
+
+
+def cmd_history(args):
+    """Requêtes sur l'historique des exécutions (taux de réussite, morceaux les plus trouvés)."""
+    import run_history
+    if args.query == "runs":
+        rows = run_history.list_runs(args.limit, db_path=args.db)
+    elif args.query == "songs":
+        rows = run_history.top_songs(args.limit, db_path=args.db)
+    else:
+        rows = run_history.hit_rate(args.query.rstrip("s"), run_id=args.run, db_path=args.db)
+    for row in rows:
+        print(" | ".join(f"{k}={v:.3f}" if isinstance(v, float) else f"{k}={v}" for k, v in row.items()))
+    if not rows:
+        print("Historique vide.")
+
+
+# Cache de réévaluation incrémentale (OCR par version de profil de crop, réponses brutes de recherche)
+EVAL_CACHE = "eval_cache.db"
+
+BACKENDS_HELP = "backends de recherche séparés par des virgules : api, scraper, catalog=JSON (défaut : api)"
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Extraction de musiques à partir de screenshots.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    commands = [
+        ("detect", cmd_detect, "dossier d'images", "screenshot_analysis.csv"),
+        ("ocr", cmd_ocr, "dossier d'images ou de vidéos", "ocr_results.csv"),
+        ("search", cmd_search, "CSV produit par 'ocr'", "main_pipeline_results.csv"),
+        ("pipeline", cmd_pipeline, "dossier d'images ou de vidéos", "main_pipeline_results.csv"),
+    ]
+    for name, func, input_help, default_output in commands:
+        p = sub.add_parser(name, help=func.__doc__)
+        p.add_argument("input", help=input_help)
+        p.add_argument("-o", "--output", default=default_output, help=f"CSV de sortie (défaut : {default_output})")
+        p.add_argument("-w", "--workers", type=int, default=1, help="nombre de workers parallèles (défaut : 1)")
+        if name in ("search", "pipeline"):
+            p.add_argument("--backends", default="api", help=BACKENDS_HELP)
+        if name in ("ocr", "search", "pipeline"):
+            p.add_argument("--no-cache", action="store_true",
+                           help=f"tout recalculer sans lire ni écrire le cache de réévaluation ({EVAL_CACHE})")
+        p.set_defaults(func=func)
+
+    p = sub.add_parser("serve", help=cmd_serve.__doc__)
+    p.add_argument("--host", default="127.0.0.1", help="adresse d'écoute (défaut : 127.0.0.1)")
+    p.add_argument("--port", type=int, default=8080, help="port d'écoute (défaut : 8080)")
+    p.add_argument("-w", "--workers", type=int, default=1, help="nombre de processus OCR (défaut : 1)")
+    p.add_argument("--batch-size", type=int, default=8, help="images maximum par lot OCR (défaut : 8)")
+    p.add_argument("--batch-wait", type=float, default=0.02, help="attente maximale pour compléter un lot, en secondes")
+    p.add_argument("--max-pending", type=int, default=32, help="images en attente avant de répondre 503 (défaut : 32)")
+    p.add_argument("--stub-catalog", help="catalogue JSON pour une recherche simulée (tests locaux, sans clé API)")
+    p.add_argument("--backends", default="api", help=BACKENDS_HELP)
+    p.set_defaults(func=cmd_serve)
+
+    p = sub.add_parser("history", help=cmd_history.__doc__)
+    p.add_argument("query", choices=["runs", "devices", "sources", "songs"], help="agrégat à afficher")
+    p.add_argument("--db", default="run_history.db", help="base d'historique (défaut : run_history.db)")
+    p.add_argument("--limit", type=int, default=10, help="nombre de lignes pour 'runs' et 'songs' (défaut : 10)")
+    p.add_argument("--run", type=int, help="limite 'devices'/'sources' à une exécution")
+    p.set_defaults(func=cmd_history)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
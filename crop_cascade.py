@@ -0,0 +1,173 @@
+"""
+Module crop_cascade.py
+Cascade de stratégies de crop pilotée par la confiance OCR.
+
+Au lieu d'un crop fixe puis d'un OCR plein écran (le cas le plus lent), on essaie d'abord
+la zone la plus petite et la moins coûteuse, on lit la confiance des mots via image_to_data,
+et on n'élargit la zone que si la confiance ou la validité des lignes est insuffisante.
+Le taux de réussite et le coût de chaque stratégie sont comptabilisés et peuvent être
+écrits dans un log pour ajuster l'ordre de la cascade à partir des données.
+"""
+
+import datetime
+import threading
+import time
+from collections import namedtuple
+
+from ocr_engine import ocr_data
+from text_rules import filter_lines
+
+# Confiance moyenne minimale (0-100) pour accepter le texte d'une stratégie
+MIN_CONFIDENCE = 60.0
+# Élargissement vertical (en hauteurs de la zone attendue) des stratégies 'widened' et 'band'
+WIDEN_FACTOR = 1.0
+BAND_FACTOR = 4.0
+
+CascadeResult = namedtuple("CascadeResult", ["text", "lines", "strategy", "confidence", "box"])
+
+
+def widen_box(box, size, factor):
+    """
+    Élargit une box verticalement de `factor` fois sa hauteur (moitié en haut, moitié en bas)
+    et horizontalement sur toute la largeur, sans sortir de l'image.
+    """
+    w, h = size
+    left, top, right, bottom = box
+    extra = int((bottom - top) * factor / 2)
+    return (0, max(0, top - extra), w, min(h, bottom + extra))
+
+
+def _tight(size, base_box):
+    return base_box
+
+
+def _widened(size, base_box):
+    return widen_box(base_box, size, WIDEN_FACTOR) if base_box else None
+
+
+def _band(size, base_box):
+    # Bande large autour de la zone attendue, ou moitié haute si aucune zone n'est connue
+    w, h = size
+    if base_box:
+        return widen_box(base_box, size, BAND_FACTOR)
+    return (0, 0, w, h // 2)
+
+
+def _full(size, base_box):
+    w, h = size
+    return (0, 0, w, h)
+
+
+# Stratégies essayées dans l'ordre, de la moins coûteuse à la plus large
+STRATEGIES = [
+    ("tight", _tight),
+    ("widened", _widened),
+    ("band", _band),
+    ("full", _full),
+]
+
+# Statistiques par (profil, stratégie) : essais, réussites, temps OCR cumulé
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def _record(profile, strategy, hit, seconds):
+    with _stats_lock:
+        entry = _stats.setdefault((profile, strategy), {"tries": 0, "hits": 0, "seconds": 0.0})
+        entry["tries"] += 1
+        entry["hits"] += int(hit)
+        entry["seconds"] += seconds
+
+
+def drain_cascade_stats():
+    """
+    Retourne les statistiques brutes accumulées dans ce processus et les remet à zéro.
+    Utilisé par les workers pour renvoyer leurs statistiques au processus principal.
+    """
+    with _stats_lock:
+        raw = dict(_stats)
+        _stats.clear()
+    return raw
+
+
+def merge_cascade_stats(raw):
+    """Ajoute des statistiques brutes (issues de drain_cascade_stats) à celles du processus courant."""
+    with _stats_lock:
+        for key, e in raw.items():
+            entry = _stats.setdefault(key, {"tries": 0, "hits": 0, "seconds": 0.0})
+            entry["tries"] += e["tries"]
+            entry["hits"] += e["hits"]
+            entry["seconds"] += e["seconds"]
+
+
+def cascade_stats():
+    """
+    Retourne les statistiques de la cascade sous forme de liste de dicts
+    (profile, strategy, tries, hits, hit_rate, avg_seconds).
+    """
+    with _stats_lock:
+        items = sorted(_stats.items())
+    return [
+        {
+            "profile": profile,
+            "strategy": strategy,
+            "tries": e["tries"],
+            "hits": e["hits"],
+            "hit_rate": e["hits"] / e["tries"] if e["tries"] else 0.0,
+            "avg_seconds": e["seconds"] / e["tries"] if e["tries"] else 0.0,
+        }
+        for (profile, strategy), e in items
+    ]
+
+
+def log_cascade_stats(log_path="crop_cascade.log"):
+    """Ajoute dans le log une ligne par (profil, stratégie) avec taux de réussite et coût moyen."""
+    now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    with open(log_path, "a", encoding="utf-8") as f:
+        for s in cascade_stats():
+            f.write(f"[{now}] PROFILE: {s['profile']} | STRATEGY: {s['strategy']} | TRIES: {s['tries']} | "
+                    f"HITS: {s['hits']} | HIT_RATE: {s['hit_rate']:.2f} | AVG_OCR_S: {s['avg_seconds']:.3f}\n")
+
+
+def run_cascade(img, base_box, extract_lines=None, profile="default", min_conf=MIN_CONFIDENCE, lang=None):
+    """
+    Applique la cascade de crops sur une image jusqu'à obtenir un texte fiable.
+
+    Args:
+        img (PIL.Image): Image complète.
+        base_box (tuple ou None): Zone attendue (left, top, right, bottom), ex: get_crop_box().
+        extract_lines (callable): Fonction texte -> liste de lignes valides (par défaut règles 'cascade' :
+            lignes non vides hors mots-clés d'interface).
+        profile (str): Libellé du profil (device/source) utilisé pour les statistiques.
+        min_conf (float): Confiance moyenne minimale pour accepter une stratégie.
+        lang (str, optionnel): Langue Tesseract imposée (None = détection automatique).
+
+    Returns:
+        CascadeResult: Meilleur résultat obtenu ; si aucune stratégie n'a produit de ligne valide,
+            texte non vide de meilleure confiance (sans lignes), texte vide si tout l'OCR est vide.
+    """
+    if extract_lines is None:
+        extract_lines = lambda text: filter_lines(text, "cascade")
+    best = CascadeResult("", [], None, 0.0, None)
+    # Dernier recours : texte non vide de meilleure confiance, même sans ligne valide
+    fallback = best
+    tried = set()
+    for name, strategy in STRATEGIES:
+        box = strategy(img.size, base_box)
+        if box is None or box in tried:
+            continue
+        tried.add(box)
+        start = time.perf_counter()
+        text, conf = ocr_data(img.crop(box), lang=lang)
+        elapsed = time.perf_counter() - start
+        lines = extract_lines(text)
+        hit = bool(lines) and conf >= min_conf
+        _record(profile, name, hit, elapsed)
+        if hit:
+            return CascadeResult(text.strip(), lines, name, conf, box)
+        # Garde le meilleur essai partiel au cas où aucune stratégie n'atteint le seuil
+        if lines and conf > best.confidence:
+            best = CascadeResult(text.strip(), lines, name, conf, box)
+        elif text.strip() and conf > fallback.confidence:
+            fallback = CascadeResult(text.strip(), [], name, conf, box)
+    return best if best.lines else fallback
@@ -15,9 +15,6 @@ import csv
 from PIL import Image
 # Import du module PIL (Python Imaging Library) pour manipuler les images
 
-import exifread
-# Import du module exifread pour lire les métadonnées EXIF des images (non utilisé dans ce module)
-
 # Les listes de résolutions d'écran d'iPhone et d'iPad ont été supprimées car la détection des appareils utilise désormais exclusivement les constantes et fonctions du module device_image_types.py.
 
 def is_close(a, b, tol=0.03):
@@ -40,6 +37,9 @@ def is_close(a, b, tol=0.03):
 from device_image_types import DEVICE_IMAGE_TYPES, IPHONE_MODELS, IPAD_MODELS, ORIENTATIONS, SOURCES, DEVICE_RESOLUTIONS, is_model_resolution, DEVICE_RESOLUTION_TOLERANCE
 # Import des constantes et fonctions du module device_image_types
 
+from metadata_probe import probe_metadata
+# Import de la sonde de métadonnées (EXIF/XMP/dimensions lus dans les premiers Ko du fichier)
+
 def get_device_and_orientation(width, height, tolerance=None):
     """
     Détecte le modèle d'appareil et l'orientation d'une image en fonction de sa taille.
@@ -87,23 +87,52 @@ def detect_source_type(img_path):
     return "Photo"
 # Fonction pour déterminer le type de source d'une image
 
+def device_from_metadata(meta, width, height):
+    """
+    Choisit le modèle d'appareil et l'orientation : tag Model s'il est connu, sinon la résolution.
+
+    Args:
+        meta (dict): Métadonnées lues par metadata_probe.probe_metadata.
+        width (int): Largeur de l'image.
+        height (int): Hauteur de l'image.
+
+    Returns:
+        tuple: (modèle, orientation)
+    """
+    device, orientation = get_device_and_orientation(width, height)
+    if meta["model"] in DEVICE_RESOLUTIONS and not orientation.endswith("_split"):
+        device = meta["model"]
+    return device, orientation
+
+
 def analyze_image(img_path):
     """
     Analyse une image pour déterminer son type de source et son modèle d'appareil.
+    Seul l'en-tête du fichier est lu : les photos d'appareil photo sont rejetées sans décodage.
 
     Args:
         img_path (str): Le chemin de l'image.
 
     Returns:
-        dict: Un dictionnaire contenant les informations sur l'image (type de source, modèle d'appareil, etc.).
+        dict: Un dictionnaire contenant les informations sur l'image (type de source, modèle d'appareil,
+              "kind" : screenshot/photo/unknown d'après les métadonnées, etc.).
     """
-    from PIL import Image
-    with Image.open(img_path) as img:
-        width, height = img.size
-    device, orientation = get_device_and_orientation(width, height)
+    # 1. Sonde des métadonnées (en-tête seulement, aucun décodage de pixels)
+    meta = probe_metadata(img_path)
     source = detect_source_type(img_path)
-    print(f"[LOG] {img_path} | resolution: {width}x{height} | device: {device}, orientation: {orientation}, source: {source}")
-    return {"device": device, "orientation": orientation, "source": source}
+    width, height = meta["width"], meta["height"]
+    if meta["kind"] == "photo":
+        # Photo d'appareil photo : rejetée sans ouvrir l'image
+        print(f"[LOG] {img_path} | photo d'appareil photo ({meta['reason']}) : ignorée")
+        return {"device": "unknown", "orientation": "portrait" if (height or 0) > (width or 0) else "landscape", "source": source, "kind": "photo"}
+    if width is None or height is None:
+        # En-tête non géré (BMP, JPEG tronqué...) : on lit les dimensions via PIL (toujours sans décoder les pixels)
+        with Image.open(img_path) as img:
+            width, height = img.size
+    # 2. Modèle donné par le tag Model s'il est connu, sinon par la résolution
+    device, orientation = device_from_metadata(meta, width, height)
+    print(f"[LOG] {img_path} | resolution: {width}x{height} | device: {device}, orientation: {orientation}, source: {source} | meta: {meta['kind']} ({meta['reason']})")
+    return {"device": device, "orientation": orientation, "source": source, "kind": meta["kind"]}
 # Fonction pour analyser une image
 
 def impr(folder):
@@ -126,23 +155,29 @@ def impr(folder):
     return results
 # Fonction pour analyser les images d'un dossier
 
-def analyze_folder(folder):
+def analyze_folder(folder, workers=1):
     """
     Analyse les images d'un dossier pour déterminer leur type de source et leur modèle d'appareil.
 
     Args:
         folder (str): Le chemin du dossier.
+        workers (int, optionnel): Nombre de threads de lecture (seuls les en-têtes sont lus, par défaut : 1).
 
     Returns:
         list: Une liste de dictionnaires contenant les informations sur les images (type de source, modèle d'appareil, etc.).
     """
+    filenames = [f for f in sorted(os.listdir(folder)) if f.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp'))]
+    paths = [os.path.join(folder, f) for f in filenames]
+    if workers > 1:
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            types = list(pool.map(analyze_image, paths))
+    else:
+        types = [analyze_image(p) for p in paths]
     results = []
-    for filename in sorted(os.listdir(folder)):
-        if filename.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp')):
-            path = os.path.join(folder, filename)
-            typ = analyze_image(path)
-            results.append({'filename': filename, 'type': typ})
-            print(f"{filename} : {typ}")
+    for filename, typ in zip(filenames, types):
+        results.append({'filename': filename, 'type': typ})
+        print(f"{filename} : {typ}")
     return results
 
 if __name__ == "__main__":
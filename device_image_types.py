@@ -112,6 +112,9 @@ def is_model_resolution(width, height, model, tolerance=None):
 # Liste des orientations supportées (sert à générer toutes les combinaisons possibles)
 ORIENTATIONS = ["portrait", "landscape"]  # "portrait" = vertical, "landscape" = horizontal
 
+# Orientations Split View (iPad uniquement), telles que renvoyées par get_device_and_orientation
+SPLIT_ORIENTATIONS = [o + "_split" for o in ORIENTATIONS]  # ex: "landscape_split"
+
 # Liste des types de sources supportées (sert à générer toutes les combinaisons possibles)
 SOURCES = ["YouTube", "Shazam", "ShazamNotification", "Photo"]  # Nom des apps ou contextes d'où provient le screenshot
 
@@ -124,6 +127,11 @@ DEVICE_IMAGE_TYPES = [
     for model in IPHONE_MODELS + IPAD_MODELS  # Pour chaque modèle supporté (iPhone et iPad)
     for orientation in ORIENTATIONS           # Pour chaque orientation possible
     for source in SOURCES                    # Pour chaque source possible
+] + [
+    {"device": model, "orientation": orientation, "source": source}  # Combinaisons Split View (iPad)
+    for model in IPAD_MODELS
+    for orientation in SPLIT_ORIENTATIONS
+    for source in SOURCES
 ]
 
 # Exemple d'utilisation :
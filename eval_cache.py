@@ -0,0 +1,195 @@
+"""
+Module eval_cache.py
+Réévaluation incrémentale : chaque résultat est rattaché aux entrées dont il dépend,
+et une nouvelle exécution ne refait que l'étape touchée, pour les seules images touchées.
+
+Entrées suivies :
+- empreinte du fichier image (contenu, pas le nom)
+- version du profil de crop (crop_version) : empreinte des zones renvoyées par get_crop_box pour le
+  groupe device/source de l'image, et des réglages de l'étape OCR (règles text_rules, cascade,
+  langues Tesseract, détection du Split View ; voir ocr_config_version)
+- version du filtre (music_search.filter_version) : empreinte de la liste noire
+- requête envoyée à la recherche
+
+Deux tables SQLite :
+- ocr_results : lignes OCR par (empreinte, crop_version). Modifier un pourcentage de crop pour un
+  device/source ne change la version que de ce groupe : seules ses images repassent à l'OCR.
+- raw_searches : réponses brutes de l'API (avant filtrage) par requête. Modifier la liste noire ne
+  fait que refiltrer ces réponses, sans aucun appel API ; un texte OCR inchangé donne la même requête.
+"""
+
+import datetime
+import hashlib
+import json
+import sqlite3
+import threading
+from collections import namedtuple
+
+from music_search import fetch_youtube_api, filter_music_results
+
+# Base du cache de réévaluation par défaut
+DEFAULT_DB = "eval_cache.db"
+
+# Tailles fictives sur lesquelles get_crop_box est évalué pour calculer la version d'un profil
+# (assez grandes pour que tout changement de pourcentage change la zone)
+PROBE_SIZES = ((10000, 20000), (20000, 10000))
+PROBE_ORIENTATIONS = ("portrait", "landscape")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ocr_results (
+    digest TEXT NOT NULL,
+    crop_version TEXT NOT NULL,
+    device TEXT,
+    source TEXT,
+    rows TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    PRIMARY KEY (digest, crop_version)
+);
+CREATE TABLE IF NOT EXISTS raw_searches (
+    backend TEXT NOT NULL,
+    query TEXT NOT NULL,
+    max_results INTEGER NOT NULL,
+    response TEXT NOT NULL,
+    fetched_at TEXT NOT NULL,
+    PRIMARY KEY (backend, query, max_results)
+);
+"""
+
+# Format des lignes OCR enregistrées : à incrémenter quand leur contenu change (ex: texte extrait
+# réduit aux lignes valides de la cascade), pour ne pas resservir des lignes de l'ancien format
+ROWS_FORMAT = 2
+
+# Objet minimal accepté par get_crop_box (seule la taille est lue)
+_ProbeImage = namedtuple("_ProbeImage", ["size"])
+
+
+def _fingerprint(*parts):
+    return hashlib.blake2b(json.dumps(parts, sort_keys=True, default=str).encode("utf-8"), digest_size=8).hexdigest()
+
+
+def ocr_config_version():
+    """
+    Empreinte des réglages de l'étape OCR communs à tous les profils : règles de filtrage, cascade
+    (seuil de confiance, stratégies et leurs facteurs d'élargissement), choix de la langue Tesseract
+    et détection du Split View (seuils du séparateur, échelle de l'aperçu).
+    """
+    # Imports différés : le cache des réponses brutes (étape 'search') ne charge pas la pile OCR
+    import crop_cascade
+    import lazy_image
+    import ocr_engine
+    import split_screen
+    from text_rules import RULE_SPECS
+    return _fingerprint(
+        ROWS_FORMAT, RULE_SPECS,
+        crop_cascade.MIN_CONFIDENCE, [name for name, _ in crop_cascade.STRATEGIES],
+        crop_cascade.WIDEN_FACTOR, crop_cascade.BAND_FACTOR,
+        ocr_engine.SCRIPT_LANGS, ocr_engine.MIN_SCRIPT_CONF, ocr_engine.DEFAULT_LANG,
+        ocr_engine.OSD_MIN_CHARACTERS, ocr_engine.SCRIPT_RANGES,
+        split_screen.DIVIDER_RANGE, split_screen.HANDLE_ZONE, split_screen.DIVIDER_MAX_LEVEL,
+        split_screen.HANDLE_MIN_LEVEL, split_screen.DIVIDER_MIN_WIDTH, split_screen.DIVIDER_MAX_WIDTH,
+        split_screen.PRECHECK_BAND,
+        lazy_image.PREVIEW_SCALE,
+    )
+
+
+def crop_version(device, source):
+    """
+    Version du profil de crop d'un groupe device/source : change dès qu'une zone de get_crop_box
+    de ce groupe (toutes orientations, panneaux Split View compris) ou un réglage OCR change.
+    """
+    from where_to_crop import get_crop_box
+    boxes = [
+        get_crop_box(_ProbeImage(size), "", device_type={"device": device, "orientation": orientation, "source": source})
+        for size in PROBE_SIZES for orientation in PROBE_ORIENTATIONS
+    ]
+    return _fingerprint(device, source, boxes, ocr_config_version())
+
+
+def _now():
+    return datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+class EvalCache:
+    """
+    Accès au cache de réévaluation (une connexion SQLite par thread ; picklable pour les workers).
+
+    Args:
+        db_path (str): Chemin de la base.
+    """
+
+    def __init__(self, db_path=DEFAULT_DB):
+        self.db_path = db_path
+        self._local = threading.local()
+
+    def __getstate__(self):
+        return {"db_path": self.db_path}
+
+    def __setstate__(self, state):
+        self.__init__(state["db_path"])
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Plusieurs workers écrivent dans la même base : WAL + attente du verrou
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def get_ocr(self, digest, version):
+        """Lignes OCR enregistrées pour cette image et cette version de profil, ou None."""
+        row = self._conn().execute(
+            "SELECT rows FROM ocr_results WHERE digest = ? AND crop_version = ?", (digest, version)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put_ocr(self, digest, version, device, source, rows):
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO ocr_results VALUES (?, ?, ?, ?, ?, ?)",
+                (digest, version, device, source, json.dumps(rows, ensure_ascii=False), _now()),
+            )
+
+    def get_raw(self, backend, query, max_results):
+        """Réponse brute enregistrée pour cette requête, ou None."""
+        row = self._conn().execute(
+            "SELECT response FROM raw_searches WHERE backend = ? AND query = ? AND max_results = ?",
+            (backend, query, max_results),
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put_raw(self, backend, query, max_results, response):
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO raw_searches VALUES (?, ?, ?, ?, ?)",
+                (backend, query, max_results, json.dumps(response, ensure_ascii=False), _now()),
+            )
+
+
+class RawCachedSearch:
+    """
+    search_fn qui enregistre les réponses brutes de l'API et les refiltre à chaque appel
+    (liste noire courante) : une requête déjà vue ne coûte plus aucun appel API.
+    Picklable : peut être envoyé aux workers de run_pipeline.
+
+    Args:
+        cache (EvalCache): Cache de réévaluation.
+        fetch_fn (callable, optionnel): Fonction (query, api_key=..., max_results=...) -> réponse brute ;
+            défaut fetch_youtube_api.
+        backend (str): Nom sous lequel les réponses sont enregistrées.
+    """
+
+    def __init__(self, cache, fetch_fn=None, backend="youtube_api"):
+        self.cache = cache
+        self.fetch_fn = fetch_fn
+        self.backend = backend
+
+    def __call__(self, query, api_key=None, max_results=5):
+        raw = self.cache.get_raw(self.backend, query, max_results)
+        if raw is None:
+            raw = (self.fetch_fn or fetch_youtube_api)(query, api_key=api_key, max_results=max_results)
+            self.cache.put_raw(self.backend, query, max_results, raw)
+        else:
+            print("→ Réponse brute réutilisée (aucun appel API), refiltrée avec la liste noire courante.")
+        return filter_music_results(raw)
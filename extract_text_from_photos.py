@@ -1,7 +1,7 @@
 """
 Module extract_text_from_photos.py
 Ce module gère l'extraction de texte OCR à partir de photos ou de screenshots Apple.
-Il utilise pytesseract pour l'OCR, PIL pour la gestion d'image, et permet d'appliquer un crop adapté selon le device, l'orientation et le type de contenu (Shazam, YouTube, etc).
+Il utilise ocr_engine (pytesseract, langue détectée automatiquement) pour l'OCR, PIL pour la gestion d'image, et permet d'appliquer un crop adapté selon le device, l'orientation et le type de contenu (Shazam, YouTube, etc).
 
 Fonctionnalités :
 - Tolérance de crop globale et paramétrable par device/type
@@ -10,10 +10,12 @@ Fonctionnalités :
 """
 
 import os
-import re
 import numpy as np
-import pytesseract
 from PIL import Image
+from ocr_engine import ocr_image
+from crop_cascade import run_cascade
+from text_rules import filter_lines, VIEWS_PATTERN
+from lazy_image import LazyImage
 
 # Tolérance de crop par (device, content_type), valeurs par défaut ajustables
 CROP_TOLERANCE = {
@@ -71,17 +73,8 @@ def extract_shazam_text(img, device, orientation):
     width, height = img.size
     crop_box = get_crop_box(device, orientation, "Shazam", width, height)
     cropped = img.crop(crop_box)
-    text = pytesseract.image_to_string(cropped, lang='eng')
-    lines = []
-    for l in text.splitlines():
-        l_strip = l.strip()
-        if not l_strip:
-            continue
-        if l_strip.startswith('©') or re.match(r'^\d+$', l_strip) or '©' in l_strip or re.match(r'.*\d+.*', l_strip):
-            break
-        lines.append(l_strip)
-        if len(lines) == 2:
-            break
+    text = ocr_image(cropped)
+    lines = filter_lines(text, "shazam")
     return " ".join(lines) if lines else ""
 
 
@@ -93,17 +86,8 @@ def extract_shazam_notif_text(img, device, orientation):
     width, height = img.size
     crop_box = get_crop_box(device, orientation, "ShazamNotif", width, height)
     cropped = img.crop(crop_box)
-    text = pytesseract.image_to_string(cropped, lang='eng')
-    lines = []
-    for l in text.splitlines():
-        l_strip = l.strip()
-        if not l_strip:
-            continue
-        if l_strip.startswith('©') or re.match(r'^\d+$', l_strip) or '©' in l_strip or re.match(r'.*\d+.*', l_strip):
-            break
-        lines.append(l_strip)
-        if len(lines) == 2:
-            break
+    text = ocr_image(cropped)
+    lines = filter_lines(text, "shazam_notif")
     return " ".join(lines) if lines else ""
 
 
@@ -115,17 +99,8 @@ def extract_apple_music_text(img, device, orientation):
     width, height = img.size
     crop_box = get_crop_box(device, orientation, "AppleMusic", width, height)
     cropped = img.crop(crop_box)
-    text = pytesseract.image_to_string(cropped, lang='eng')
-    lines = []
-    for l in text.splitlines():
-        l_strip = l.strip()
-        if not l_strip:
-            continue
-        if l_strip.startswith('©') or re.match(r'^\d+$', l_strip) or '©' in l_strip or re.match(r'.*\d+.*', l_strip):
-            break
-        lines.append(l_strip)
-        if len(lines) == 2:
-            break
+    text = ocr_image(cropped)
+    lines = filter_lines(text, "apple_music")
     return " ".join(lines) if lines else ""
 
 
@@ -137,7 +112,8 @@ def extract_youtube_text(img, device, orientation):
     - Fait l'OCR uniquement entre ces deux bornes
     - Filtre strictement le texte : jamais de ligne vide, numérique seule, copyright, ni la ligne 'vues/views' ou ce qui est en dessous
     """
-    img_array = np.array(img.convert('RGB'))
+    # np.asarray : pas de copie supplémentaire, et vue directe si img est une FrameImage (frame déjà en mémoire)
+    img_array = np.asarray(img.convert('RGB'))
     h, w, _ = img_array.shape
     # 1. Détection de la barre de lecture (ligne fine blanche/grise/rouge)
     barre_lecture_y = None
@@ -156,52 +132,38 @@ def extract_youtube_text(img, device, orientation):
     ocr_zone_top = barre_lecture_y+1 if barre_lecture_y else search_start
     ocr_zone_bottom = min(h, ocr_zone_top+int(0.25*h))
     cropped_bottom = img.crop((0, ocr_zone_top, w, ocr_zone_bottom))
-    text_bottom = pytesseract.image_to_string(cropped_bottom, lang='eng')
+    text_bottom = ocr_image(cropped_bottom)
     # Cherche la ligne 'vues/views' et approxime sa position
     for idx, line in enumerate(text_bottom.splitlines()):
-        if re.search(r'[0-9][0-9\., kKmM]*\s*(vues|views)', line, re.IGNORECASE):
+        if VIEWS_PATTERN.search(line):
             vues_views_y = ocr_zone_top + int((idx/len(text_bottom.splitlines()))*(ocr_zone_bottom-ocr_zone_top))
             break
     # 3. Crop dynamique entre barre_lecture_y et vues_views_y
     if barre_lecture_y and vues_views_y and vues_views_y > barre_lecture_y:
         crop_box = (0, barre_lecture_y, w, vues_views_y)
         cropped = img.crop(crop_box)
-        text = pytesseract.image_to_string(cropped, lang='eng')
-        # 4. Filtrage strict
-        lines = []
-        for l in text.splitlines():
-            l_strip = l.strip()
-            if not l_strip:
-                continue
-            if re.search(r'[0-9][0-9\., kKmM]*\s*(vues|views)', l_strip, re.IGNORECASE):
-                break
-            if l_strip.startswith('©') or re.match(r'^\d+$', l_strip) or '©' in l_strip:
-                continue
-            lines.append(l_strip)
-            if len(lines) == 2:
-                break
+        text = ocr_image(cropped)
+        # 4. Filtrage strict (arrêt à la ligne 'vues/views', jamais de copyright ni de nombre seul)
+        lines = filter_lines(text, "youtube")
         return " ".join(lines) if lines else ""
     else:
-        # fallback : crop fixe (x : 0-1, y : 0.37-0.45 pour iPhone, 0.90-0.94 pour iPad)
+        # fallback : cascade à partir du crop fixe (x : 0-1, y : 0.37-0.45 pour iPhone, 0.90-0.94 pour iPad),
+        # élargi seulement si la confiance OCR ou les lignes obtenues sont insuffisantes
         if device == "iPhone":
             crop_box = (0, int(0.37 * h), w, int(0.45 * h))
         elif device == "iPad":
             crop_box = (0, int(0.90 * h), w, int(0.94 * h))
         else:
             crop_box = (0, int(0.37 * h), w, int(0.45 * h))
-        cropped = img.crop(crop_box)
-        text = pytesseract.image_to_string(cropped, lang='eng')
-        lines = []
-        for l in text.splitlines():
-            l_strip = l.strip()
-            if not l_strip:
-                continue
-            if l_strip.startswith('©') or re.match(r'^\d+$', l_strip) or '©' in l_strip:
-                continue
-            lines.append(l_strip)
-            if len(lines) == 2:
-                break
-        return " ".join(lines) if lines else ""
+        result = run_cascade(img, crop_box, extract_lines=_youtube_fallback_lines, profile=f"{device} {orientation} YouTube")
+        return " ".join(result.lines) if result.lines else ""
+
+
+def _youtube_fallback_lines(text):
+    """
+    Filtre du fallback YouTube : jamais de ligne vide, numérique seule ni copyright, 2 lignes maximum.
+    """
+    return filter_lines(text, "youtube_fallback")
 
 
 def extract_key_text(img, device, orientation, content_type):
@@ -218,34 +180,35 @@ def extract_key_text(img, device, orientation, content_type):
         return extract_youtube_text(img, device, orientation)
     else:
         # fallback : OCR plein écran
-        return pytesseract.image_to_string(img, lang='eng')
+        return ocr_image(img)
 
 
-def extract_text(image_path, lang='eng'):
+def extract_text(image_path, lang=None):
     """
     Extrait le texte d'une image via OCR (plein écran, fallback ou debug).
     Args:
         image_path (str): Chemin vers l'image à traiter.
-        lang (str): Langue à utiliser pour l'OCR (par défaut 'eng').
+        lang (str): Langue à utiliser pour l'OCR (par défaut None : détection automatique du script).
 
     Returns:
         str: Texte extrait de l'image.
     """
     # Ouvre l'image à partir du chemin fourni
     img = Image.open(image_path)
-    # Applique l'OCR avec pytesseract sur l'image
-    text = pytesseract.image_to_string(img, lang=lang)
-    # Retourne le texte extrait    return text
+    # Applique l'OCR (langue choisie selon le script détecté si lang est None)
+    text = ocr_image(img, lang=lang)
+    # Retourne le texte extrait
+    return text
 
 
-def ocr_all_in_folder(folder, lang='eng', crop_box=None):
+def ocr_all_in_folder(folder, lang=None, crop_box=None):
     """
     Parcourt tous les fichiers image d'un dossier et extrait le texte OCR de chacun.
     Peut appliquer un crop sur chaque image avant OCR si crop_box est défini.
 
     Args:
         folder (str): Chemin du dossier à parcourir.
-        lang (str): Langue pour l'OCR (par défaut 'eng').
+        lang (str): Langue pour l'OCR (par défaut None : détection automatique du script).
         crop_box (tuple ou None): Zone de crop (left, upper, right, lower) ou None pour ne pas croper.
 
     Returns:
@@ -257,12 +220,13 @@ def ocr_all_in_folder(folder, lang='eng', crop_box=None):
         # Vérifie si le fichier est une image supportée (png, jpg, jpeg, bmp)
         if filename.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp')):
             img_path = os.path.join(folder, filename)  # Construit le chemin complet
-            img = Image.open(img_path)  # Ouvre l'image
             if crop_box:
-                # Si un crop est défini, on applique le crop à l'image
-                img = img.crop(crop_box)
+                # Si un crop est défini, seules les lignes jusqu'au bas du crop sont décodées
+                img = LazyImage(img_path).crop(crop_box)
+            else:
+                img = Image.open(img_path)  # Ouvre l'image
             # Applique l'OCR sur l'image (croppée ou non)
-            text = pytesseract.image_to_string(img, lang=lang)
+            text = ocr_image(img, lang=lang)
             # Ajoute le résultat à la liste
             results.append({'file': filename, 'text': text})
             # Affiche le texte extrait pour debug
@@ -280,4 +244,4 @@ if __name__ == "__main__":
     # Exemple d'utilisation : crop_box = (left, top, right, bottom)
     crop_box = None
     # Lance l'OCR sur tout le dossier avec les paramètres choisis
-    ocr_all_in_folder(folder, lang='eng', crop_box=crop_box)
+    ocr_all_in_folder(folder, crop_box=crop_box)
@@ -0,0 +1,41 @@
+"""
+Module frame_image.py
+Frames décodées en mémoire (tableaux NumPy) présentées avec l'interface PIL des extracteurs.
+
+Les workers du pool de processus reçoivent des chemins de fichiers, jamais des frames : chaque worker
+ouvre et décode lui-même son image (paresseusement, voir lazy_image), donc aucune frame n'est picklée
+entre processus. Les frames qui existent déjà en mémoire (panneaux Split View, images extraites des
+vidéos) sont enveloppées dans une FrameImage pour passer dans la cascade de crops sans recopie.
+"""
+
+import numpy as np
+from PIL import Image
+
+
+class FrameImage:
+    """
+    Adaptateur minimal autour d'une vue NumPy (H, W, 3) offrant l'interface PIL utilisée par
+    les extracteurs (size, mode, crop, convert). Seul le crop demandé est copié.
+    """
+
+    mode = "RGB"
+
+    def __init__(self, array):
+        self.array = array
+
+    @property
+    def size(self):
+        h, w = self.array.shape[:2]
+        return (w, h)
+
+    def crop(self, box):
+        left, top, right, bottom = box
+        return Image.fromarray(np.ascontiguousarray(self.array[top:bottom, left:right]))
+
+    def convert(self, mode):
+        if mode == self.mode:
+            return self
+        return Image.fromarray(self.array).convert(mode)
+
+    def __array__(self, dtype=None, copy=None):
+        return self.array if dtype is None else self.array.astype(dtype)
@@ -0,0 +1,305 @@
+"""
+Module http_service.py
+Service HTTP embarquable (bibliothèque standard uniquement) : un screenshot envoyé, une URL YouTube en retour.
+
+    POST /search?name=capture.png   corps = octets de l'image (PNG ou JPEG)
+        → 200 {"results": [{"image", "device_type", "extracted_text", "youtube_title", "youtube_url"}, ...]}
+    GET /health
+        → 200 {"status": "ok", "pending": ..., "busy_batches": ..., "cached_results": ...}
+
+Chaque image suit la même chaîne que la pipeline : analyze_image → crop (cascade) → OCR → recherche.
+- Micro-batching : les requêtes concurrentes sont regroupées (au plus batch_size images, ou ce qui est
+  arrivé en batch_wait secondes) en une seule tâche du pool OCR, dont les workers gardent leurs modèles chargés.
+- Contre-pression : au plus `workers` lots en cours dans le pool ; au-delà les images attendent dans une
+  file bornée (max_pending) et, quand elle est pleine, le service répond 503 avec Retry-After.
+- Caches : résultat par empreinte du fichier (un même screenshot n'est traité qu'une fois, même envoyé
+  deux fois en même temps), caches OCR des workers (ocr_engine), cache LRU des recherches par requête.
+- search_fn remplaçable (ex: regression_harness.make_stub_search) pour tester en local sans clé API.
+"""
+
+import hashlib
+import json
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from crop_cascade import drain_cascade_stats, log_cascade_stats, merge_cascade_stats
+from main import extract_file_text
+from music_search import cached_search, search_youtube_api
+from ocr_engine import get_ocr_pool
+from search_stage import search_text
+
+# Nombre maximal d'images par lot envoyé au pool OCR
+BATCH_SIZE = 8
+# Attente maximale (secondes) pour compléter un lot une fois la première image arrivée
+BATCH_WAIT = 0.02
+# Nombre maximal d'images en attente d'un worker ; au-delà : 503
+MAX_PENDING = 32
+# Taille maximale d'un envoi (octets) ; au-delà : 413
+MAX_UPLOAD_BYTES = 20 * 1024 * 1024
+# Délai maximal (secondes) de traitement d'une requête ; au-delà : 504
+REQUEST_TIMEOUT = 120
+# Nombre maximal de résultats gardés par empreinte de fichier (LRU)
+RESULT_CACHE_SIZE = 1024
+
+# Signatures des formats acceptés → extension du fichier temporaire (analyze_image lit un chemin)
+UPLOAD_SIGNATURES = ((b"\x89PNG\r\n\x1a\n", ".png"), (b"\xff\xd8", ".jpg"))
+
+
+class ServiceBusy(Exception):
+    """File d'attente pleine : le client doit réessayer plus tard (HTTP 503)."""
+
+
+class UnsupportedUpload(ValueError):
+    """Le corps de la requête n'est ni un PNG ni un JPEG (HTTP 415)."""
+
+
+def _ocr_batch(paths):
+    # Tâche de worker : un lot d'images traité d'affilée ; une image en erreur n'invalide pas le lot
+    outputs = []
+    for path in paths:
+        try:
+            outputs.append((extract_file_text(path), None))
+        except Exception as e:
+            outputs.append(([], f"{type(e).__name__}: {e}"))
+    return outputs, drain_cascade_stats()
+
+
+def _upload_extension(data):
+    for signature, ext in UPLOAD_SIGNATURES:
+        if data.startswith(signature):
+            return ext
+    raise UnsupportedUpload("format non géré (PNG ou JPEG attendu)")
+
+
+class PipelineService:
+    """
+    Pipeline partagée par toutes les requêtes HTTP : file bornée, thread de regroupement en lots,
+    pool OCR (processus) et pool de recherches (threads).
+
+    Args:
+        api_key (str, optionnel): Clé API YouTube (inutile avec un search_fn simulé).
+        search_fn (callable, optionnel): Fonction (query, api_key=...) -> résultats ; défaut search_youtube_api.
+        workers (int): Nombre de processus OCR (= nombre maximal de lots en cours).
+        batch_size (int): Nombre maximal d'images par lot.
+        batch_wait (float): Attente maximale pour compléter un lot.
+        max_pending (int): Taille de la file d'attente avant de répondre 503.
+    """
+
+    def __init__(self, api_key=None, search_fn=None, workers=1, batch_size=BATCH_SIZE,
+                 batch_wait=BATCH_WAIT, max_pending=MAX_PENDING):
+        self.api_key = api_key
+        self.search_fn = cached_search(search_fn or search_youtube_api)
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        self.batch_wait = batch_wait
+        self._pending = queue.Queue(maxsize=max_pending)
+        self._slots = threading.Semaphore(self.workers)
+        self._busy_batches = 0
+        self._pool = get_ocr_pool(self.workers)
+        # Recherches réseau : un pool de threads suffit
+        self._search_pool = ThreadPoolExecutor(max_workers=self.batch_size)
+        self._tmpdir = tempfile.mkdtemp(prefix="musicsearch_")
+        self._results = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._batcher = threading.Thread(target=self._batch_loop, name="batcher", daemon=True)
+        self._batcher.start()
+
+    def submit(self, data):
+        """
+        Met une image en file (ou réutilise le résultat d'un envoi identique, terminé ou en cours).
+
+        Returns:
+            Future: Lignes résultat, dont le champ 'image' ne garde que le suffixe ('' ou '#left'/'#right').
+
+        Raises:
+            UnsupportedUpload: Ni PNG ni JPEG.
+            ServiceBusy: File d'attente pleine.
+        """
+        ext = _upload_extension(data)
+        digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+        with self._lock:
+            if digest in self._results:
+                self._results.move_to_end(digest)
+                future = Future()
+                future.set_result(self._results[digest])
+                return future
+            if digest in self._inflight:
+                return self._inflight[digest]
+            future = self._inflight[digest] = Future()
+        path = os.path.join(self._tmpdir, digest + ext)
+        with open(path, "wb") as f:
+            f.write(data)
+        try:
+            self._pending.put_nowait((digest, path, future))
+        except queue.Full:
+            _remove(path)
+            self._finish(digest, future, error=ServiceBusy("file d'attente pleine"))
+        return future
+
+    def process(self, data, name="upload", timeout=REQUEST_TIMEOUT):
+        """
+        Traite une image de bout en bout (bloquant).
+
+        Returns:
+            list: Lignes {"image", "device_type", "extracted_text", "youtube_title", "youtube_url"}
+                  (vide si l'image est ignorée : device ou source non supportés, photo d'appareil photo).
+        """
+        rows = self.submit(data).result(timeout=timeout)
+        return [dict(row, image=name + row["image"]) for row in rows]
+
+    def status(self):
+        """État courant, pour /health et la supervision."""
+        with self._lock:
+            return {"pending": self._pending.qsize(), "busy_batches": self._busy_batches, "cached_results": len(self._results)}
+
+    def close(self):
+        """Arrête le regroupement, attend les lots en cours et écrit les statistiques de la cascade."""
+        self._stopped.set()
+        self._batcher.join()
+        self._pool.shutdown(wait=True)
+        self._search_pool.shutdown(wait=True)
+        shutil.rmtree(self._tmpdir, ignore_errors=True)
+        log_cascade_stats()
+
+    def _batch_loop(self):
+        while not self._stopped.is_set():
+            try:
+                batch = [self._pending.get(timeout=0.2)]
+            except queue.Empty:
+                continue
+            # Contre-pression : attend un worker libre ; pendant ce temps la file se remplit (lots plus gros)
+            self._slots.acquire()
+            deadline = time.monotonic() + self.batch_wait
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._pending.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            with self._lock:
+                self._busy_batches += 1
+            future = self._pool.submit(_ocr_batch, [path for _, path, _ in batch])
+            future.add_done_callback(lambda f, batch=batch: self._on_batch_done(batch, f))
+
+    def _on_batch_done(self, batch, future):
+        with self._lock:
+            self._busy_batches -= 1
+        self._slots.release()
+        try:
+            outputs, stats = future.result()
+        except Exception as e:
+            # Worker perdu (processus tué...) : tout le lot est en erreur
+            outputs, stats = [([], f"{type(e).__name__}: {e}")] * len(batch), {}
+        merge_cascade_stats(stats)
+        for (digest, path, waiter), (rows, error) in zip(batch, outputs):
+            _remove(path)
+            if error:
+                self._finish(digest, waiter, error=RuntimeError(error))
+            else:
+                self._search_pool.submit(self._search_rows, digest, path, waiter, rows)
+
+    def _search_rows(self, digest, path, waiter, rows):
+        prefix = len(os.path.basename(path))
+        try:
+            found = [search_text(row, self.api_key, search_fn=self.search_fn) for row in rows]
+        except Exception as e:
+            self._finish(digest, waiter, error=e)
+            return
+        self._finish(digest, waiter, [dict(row, image=row["image"][prefix:]) for row in found])
+
+    def _finish(self, digest, waiter, rows=None, error=None):
+        with self._lock:
+            self._inflight.pop(digest, None)
+            if error is None:
+                self._results[digest] = rows
+                while len(self._results) > RESULT_CACHE_SIZE:
+                    self._results.popitem(last=False)
+        if error is None:
+            waiter.set_result(rows)
+        else:
+            waiter.set_exception(error)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    """Routes /search et /health ; le service partagé est porté par le serveur (self.server.service)."""
+
+    def do_GET(self):
+        if urlparse(self.path).path != "/health":
+            self._send_json(404, {"error": "route inconnue"})
+            return
+        self._send_json(200, dict(status="ok", **self.server.service.status()))
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != "/search":
+            self._send_json(404, {"error": "route inconnue"})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        if length <= 0:
+            self._send_json(400, {"error": "corps vide (octets de l'image attendus)"})
+            return
+        if length > MAX_UPLOAD_BYTES:
+            self.close_connection = True
+            self._send_json(413, {"error": f"image trop grande (max {MAX_UPLOAD_BYTES} octets)"})
+            return
+        data = self.rfile.read(length)
+        name = os.path.basename(parse_qs(url.query).get("name", ["upload"])[0]) or "upload"
+        try:
+            rows = self.server.service.process(data, name)
+        except ServiceBusy as e:
+            self._send_json(503, {"error": str(e)}, headers={"Retry-After": "1"})
+        except UnsupportedUpload as e:
+            self._send_json(415, {"error": str(e)})
+        except FutureTimeout:
+            self._send_json(504, {"error": "délai de traitement dépassé"})
+        except Exception as e:
+            self._send_json(500, {"error": f"{type(e).__name__}: {e}"})
+        else:
+            self._send_json(200, {"results": rows})
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def make_server(service, host="127.0.0.1", port=8080):
+    """Crée le serveur HTTP (un thread par connexion) attaché à un PipelineService."""
+    server = ThreadingHTTPServer((host, port), RequestHandler)
+    server.service = service
+    return server
+
+
+def serve(host="127.0.0.1", port=8080, **service_kwargs):
+    """Lance le service jusqu'à Ctrl+C (service_kwargs : voir PipelineService)."""
+    service = PipelineService(**service_kwargs)
+    server = make_server(service, host, port)
+    print(f"Service à l'écoute sur http://{host}:{server.server_port} (POST /search, GET /health)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
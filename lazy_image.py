@@ -0,0 +1,139 @@
+"""
+Module lazy_image.py
+Décodage paresseux et partiel des screenshots : on ne décode que ce que l'OCR lit réellement.
+
+Seuls 6 à 18 % de la hauteur d'un screenshot sont passés à l'OCR (bande titre/artiste, souvent en haut
+de l'écran). LazyImage expose la même interface que PIL.Image pour la cascade de crops (size, crop)
+mais sans décoder l'image à l'ouverture :
+- crop(box) ne décode que les lignes 0..bas du crop : PNG (non entrelacé) et JPEG (baseline) sont
+  décodés de haut en bas, on arrête simplement le décodeur à la dernière ligne utile ;
+- si une stratégie plus large de la cascade a besoin de plus de lignes, la bande est redécodée plus
+  haute ; l'image complète n'est matérialisée que si une stratégie (ou une conversion) la demande ;
+- preview() donne un aperçu réduit décodé en mode draft JPEG (mise à l'échelle DCT par libjpeg),
+  suffisant pour les analyses grossières comme la détection du séparateur Split View ; pour les PNG
+  (sans draft), head() donne une bande haute, réutilisée ensuite par les crops.
+"""
+
+from PIL import Image
+
+# Formats dont le décodeur produit les lignes de haut en bas (arrêt anticipé possible)
+PARTIAL_FORMATS = ("PNG", "JPEG")
+# Facteur de réduction de l'aperçu (draft JPEG : 1/2, 1/4 ou 1/8)
+PREVIEW_SCALE = 2
+
+
+def decode_rows(path, rows):
+    """
+    Décode uniquement les `rows` premières lignes d'une image (toute l'image si le format ne s'y prête pas).
+
+    Args:
+        path (str): Chemin de l'image.
+        rows (int): Nombre de lignes à décoder depuis le haut.
+
+    Returns:
+        PIL.Image: Image décodée de taille (largeur, rows), ou image complète.
+    """
+    im = Image.open(path)
+    w, h = im.size
+    partial = (
+        0 < rows < h
+        and im.format in PARTIAL_FORMATS
+        and len(im.tile) == 1
+        and not im.info.get("interlace")
+        and not im.info.get("progressive")
+    )
+    if not partial:
+        im.load()
+        return im
+    codec, _, offset, args = im.tile[0]
+    try:
+        # Le décodeur s'arrête dès que l'image cible (raccourcie à `rows` lignes) est remplie.
+        # _size n'a pas d'équivalent public : si une version de Pillow ne l'accepte plus, décodage complet
+        im.tile = [(codec, (0, 0, w, rows), offset, args)]
+        im._size = (w, rows)
+    except (AttributeError, TypeError):
+        im = Image.open(path)
+        im.load()
+        return im
+    try:
+        im.load()
+    except OSError:
+        # libjpeg signale l'arrêt avant la fin du flux ; les lignes demandées sont pourtant décodées
+        if im.format != "JPEG" or im.tile:
+            raise
+    return im
+
+
+class LazyImage:
+    """
+    Image ouverte sans décodage des pixels ; les lignes sont décodées à la demande.
+
+    Args:
+        path (str): Chemin de l'image.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with Image.open(path) as im:
+            self.size = im.size
+            self.mode = im.mode
+            self.format = im.format
+        self._full = None
+        self._head = None
+
+    @property
+    def decoded_rows(self):
+        """Nombre de lignes décodées jusqu'ici (pour les benchmarks)."""
+        if self._full is not None:
+            return self.size[1]
+        return self._head.size[1] if self._head is not None else 0
+
+    def materialize(self):
+        """Décode l'image complète (une seule fois) et la retourne."""
+        if self._full is None:
+            self._full = Image.open(self.path)
+            self._full.load()
+            self._head = None
+        return self._full
+
+    def head(self, rows):
+        """
+        Image décodée couvrant au moins les `rows` premières lignes.
+
+        Returns:
+            PIL.Image: Bande haute (largeur complète) ou image complète si elle est déjà décodée
+                       (ou si le format ne se décode pas partiellement).
+        """
+        rows = min(self.size[1], rows)
+        if self._full is not None or rows >= self.size[1]:
+            return self.materialize()
+        if self._head is None or self._head.size[1] < rows:
+            self._head = decode_rows(self.path, rows)
+            if self._head.size == self.size:
+                # Format non décodable partiellement : l'image complète est déjà là
+                self._full, self._head = self._head, None
+                return self._full
+        return self._head
+
+    def crop(self, box):
+        """Même contrat que PIL.Image.crop ; ne décode que les lignes jusqu'au bas de la zone."""
+        return self.head(box[3]).crop(box)
+
+    def convert(self, mode):
+        return self.materialize().convert(mode)
+
+    def preview(self):
+        """
+        Aperçu réduit pour les analyses grossières.
+
+        Returns:
+            tuple: (PIL.Image, facteur) ; JPEG décodé en draft à 1/PREVIEW_SCALE, sinon image complète
+                   (alors matérialisée et réutilisée par les crops suivants) avec un facteur 1.
+        """
+        if self._full is None and self.format == "JPEG":
+            im = Image.open(self.path)
+            w, h = self.size
+            im.draft("RGB", (w // PREVIEW_SCALE, h // PREVIEW_SCALE))
+            im.load()
+            return im, w / im.size[0]
+        return self.materialize(), 1
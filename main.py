@@ -6,68 +6,393 @@ Ce script détecte le device, extrait le texte via OCR, recherche la musique sur
 
 # Import du module os pour la gestion des chemins, dossiers et variables d'environnement
 import os
-# Import de PIL (Pillow) pour ouvrir et manipuler les images
-from PIL import Image
-# Import de pytesseract pour l'OCR
-import pytesseract
 # Import de la fonction de crop adaptée au device/type
 from where_to_crop import get_crop_box
-# Import de la fonction de recherche YouTube
-from music_search import search_youtube_api
+# Import de la cascade de crops pilotée par la confiance OCR
+from crop_cascade import run_cascade, log_cascade_stats, drain_cascade_stats, merge_cascade_stats
+# Import du pool de workers OCR (modèles de langue gardés chargés)
+from ocr_engine import get_ocr_pool
+# Import de l'adaptateur PIL des frames déjà en mémoire (panneaux Split View, frames de vidéo)
+from frame_image import FrameImage
+# Import du décodage paresseux (seules les lignes couvertes par les crops sont décodées)
+from lazy_image import LazyImage
+# Import de la détection du Split View iPad
+from split_screen import split_panes, pane_orientation
+# Import du pool de threads (panneaux Split View, recherches réseau) et de la collecte au fil de l'eau
+from concurrent.futures import ThreadPoolExecutor, as_completed
+# Import de l'ordonnancement par priorité (images peu coûteuses / à fort rendement d'abord)
+from scheduler import schedule
+# Import de l'étape de recherche (sans dépendance OCR : utilisable seule par le CLI)
+from search_stage import search_text, log_full, write_csv, write_ocr_csv, run_search_stage, RESULT_FIELDS
+# Import du cache de réévaluation incrémentale (OCR par version de profil, réponses brutes de recherche)
+from eval_cache import EvalCache, RawCachedSearch, crop_version, DEFAULT_DB as EVAL_CACHE_DB
+# Import de l'historique des exécutions (base SQLite en ajout seul)
+from run_history import record_run, DEFAULT_DB as HISTORY_DB
 # Import de la fonction d'analyse device/source
 from detect_source_type import analyze_image
 # Import de la liste des combinaisons device/orientation/source supportées
 from device_image_types import DEVICE_IMAGE_TYPES
 # Import du module sys pour la gestion des arguments et de la sortie
 import sys
-# Import du module csv pour la sauvegarde des résultats
-import csv
-# Import du module datetime pour le timestamp dans les logs
-import datetime
+# Import de hashlib pour dédupliquer les fichiers identiques (même contenu)
+import hashlib
+# Import de time pour mesurer la durée de chaque étape (historique des exécutions)
+import time
 
 
-def process_image(image_path, device_type):
+def process_image(image_path, device_type, img=None):
     """
-    Extrait le texte OCR d'une image, après crop adapté selon le device/type.
+    Extrait le texte OCR d'une image via la cascade de crops (zone serrée d'abord,
+    élargie seulement si la confiance OCR ou la validité des lignes est insuffisante).
+    Voir run_image_cascade pour les arguments ; seul le texte est retourné.
+
+    Returns:
+        str: Texte extrait de l'image (nettoyé).
+    """
+    return cascade_text(run_image_cascade(image_path, device_type, img=img))
+
+
+def cascade_text(result):
+    """
+    Texte d'un CascadeResult à chercher et à loguer : les lignes valides jointes (sans le bruit d'interface
+    d'une zone élargie), ou le texte brut si aucune ligne n'est valide (comme extract_youtube_text).
+    """
+    return " ".join(result.lines) if result.lines else result.text
+
+
+def run_image_cascade(image_path, device_type, img=None):
+    """
+    Cascade de crops sur une image, avec le détail du résultat (zone retenue, stratégie, confiance).
 
     Args:
         image_path (str): Chemin vers l'image à traiter.
-        device_type (str): Chaîne décrivant le device/orientation/source (pour le crop).
+        device_type (dict ou str): Device/orientation/source (dict {"device", "orientation", "source"},
+            ou ancienne chaîne descriptive) pour le crop.
+        img (PIL.Image, FrameImage ou LazyImage, optionnel): Image déjà ouverte (ex: panneau Split View, frame de vidéo) ;
+            si absente, l'image est ouverte depuis image_path sans être décodée (LazyImage).
 
     Returns:
-        str: Texte extrait de l'image (nettoyé).
+        CascadeResult: Texte extrait (nettoyé), lignes, stratégie, confiance et zone de crop retenues.
     """
-    # Ouvre l'image à partir du chemin fourni
-    img = Image.open(image_path)
-    # Détermine la zone de crop optimale selon le device/type
+    # Ouvre l'image à partir du chemin fourni (sauf si elle est déjà ouverte) ; décodée au fil des crops
+    if img is None:
+        img = LazyImage(image_path)
+    # Détermine la zone de crop optimale selon le device/type (point de départ de la cascade)
     crop_box = get_crop_box(img, os.path.basename(image_path), device_type=device_type)
-    if crop_box:
-        # Si un crop est défini, on applique le crop
-        cropped = img.crop(crop_box)
-        if os.environ.get("DEBUG_CROP") == "1":
-            # Sauvegarde le crop dans un sous-dossier 'debug_crops' (crée-le si besoin)
-            os.makedirs("debug_crops", exist_ok=True)
-            cropped.save(os.path.join("debug_crops", os.path.basename(image_path)))
-        img = cropped
-    # Effectue l'OCR sur l'image (croppée ou non)
-    text = pytesseract.image_to_string(img, lang='eng')
-    # Retourne le texte extrait, nettoyé des espaces superflus
-    return text.strip()
+    # Libellé du profil pour les statistiques de la cascade
+    if isinstance(device_type, dict):
+        profile = f"{device_type['device']} {device_type['orientation']} {device_type['source']}"
+    else:
+        profile = str(device_type)
+    # Cascade : crop serré -> élargi -> bande -> image complète, arrêt dès que le texte est fiable
+    result = run_cascade(img, crop_box, profile=profile)
+    if result.box and os.environ.get("DEBUG_CROP") == "1":
+        # Sauvegarde le crop retenu dans un sous-dossier 'debug_crops' (crée-le si besoin)
+        os.makedirs("debug_crops", exist_ok=True)
+        img.crop(result.box).save(os.path.join("debug_crops", os.path.basename(image_path)))
+    return result
+
+
+# Extensions d'images acceptées par la pipeline
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+# Extensions des enregistrements d'écran (même liste que video_ingest, importé seulement si besoin)
+VIDEO_EXTENSIONS = ('.mp4', '.mov', '.m4v')
+
+def list_inputs(folder):
+    """Retourne les chemins des images et vidéos supportées d'un dossier, triés par nom de fichier."""
+    return [os.path.join(folder, f) for f in sorted(os.listdir(folder)) if f.lower().endswith(IMAGE_EXTENSIONS + VIDEO_EXTENSIONS)]
 
 
-def log_full(info, log_path="main_pipeline.log"):
+def file_digest(path):
+    """Empreinte du contenu d'un fichier (sert à ne traiter qu'une fois les doublons)."""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def group_duplicates(paths):
     """
-    Ajoute une ligne détaillée dans le fichier log principal pour chaque image traitée.
+    Regroupe les chemins par contenu identique, dans l'ordre de première apparition.
+
+    Returns:
+        dict: Empreinte du contenu -> liste de chemins ; le premier chemin de chaque groupe est celui traité.
+    """
+    groups = {}
+    for path in paths:
+        groups.setdefault(file_digest(path), []).append(path)
+    return groups
+
+
+def detect_device_type(img_path):
+    """
+    Détecte device/orientation/source et vérifie que la combinaison est supportée.
+
+    Returns:
+        dict ou None: {"device", "orientation", "source"} ou None si l'image doit être ignorée.
+    """
+    info = analyze_image(img_path)
+    device = info["device"]
+    orientation = info["orientation"]
+    source = info["source"]
+
+    # Tri 0 : photo d'appareil photo reconnue par ses métadonnées (aucun pixel décodé)
+    if info.get("kind") == "photo":
+        print("Photo d'appareil photo (métadonnées EXIF). Fichier ignoré.")
+        return None
+
+    # Tri 1 : vérifie si le device est connu
+    device_known = any(d["device"] == device for d in DEVICE_IMAGE_TYPES)
+    if not device_known:
+        print(f"Appareil non reconnu : {device}. Fichier ignoré.")
+        return None
+
+    # Tri 2 : vérifie si la combinaison device/orientation/source est supportée
+    match = next((d for d in DEVICE_IMAGE_TYPES if d["device"] == device and d["orientation"] == orientation and d["source"] == source), None)
+    if not match:
+        print(f"Type d'image/source non reconnu pour {device}, {orientation}, {source}. Fichier ignoré.")
+        return None
+    return {"device": device, "orientation": orientation, "source": source}
+
+
+def extract_file_text(img_path, cache=None, digest=None):
+    """
+    Étapes 1 et 2 pour un fichier : détection du device/type puis OCR avec cascade de crops.
+    Un screenshot iPad en Split View donne deux lignes (une par panneau, ex: 'image.png#left'),
+    extraites en parallèle à partir d'un seul décodage ; une vidéo donne une ligne par morceau.
 
     Args:
-        info (dict): Dictionnaire contenant les infos à logger (image, device_type, texte, youtube).
-        log_path (str): Chemin du fichier log (par défaut 'main_pipeline.log').
+        img_path (str): Chemin de l'image ou de la vidéo.
+        cache (EvalCache, optionnel): Cache de réévaluation ; l'OCR n'est refait que si l'image
+            ou la version du profil de crop de son groupe device/source a changé.
+        digest (str, optionnel): Empreinte du fichier déjà calculée (group_duplicates) ; évite de le relire.
+
+    Returns:
+        list: Liste de {"image", "device_type", "extracted_text"} (vide si l'image est ignorée).
+    """
+    filename = os.path.basename(img_path)
+    print(f"\n=== Traitement de {filename} ===")
+    if filename.lower().endswith(VIDEO_EXTENSIONS):
+        # Enregistrement d'écran : une ligne par morceau distinct (OCR seulement quand la zone titre change)
+        from video_ingest import extract_video_text
+        return extract_video_text(img_path, lambda name, info, frame: process_image(name, info, img=frame))
+    start = time.perf_counter()
+    device_info = detect_device_type(img_path)
+    detect_seconds = time.perf_counter() - start
+    if device_info is None:
+        return []
+    print(f"Type détecté : {device_info['device']} {device_info['orientation']} {device_info['source']}")
+    if cache is None:
+        return _extract_detected(img_path, device_info, detect_seconds)
+    digest = digest or file_digest(img_path)
+    version = crop_version(device_info["device"], device_info["source"])
+    cached = cache.get_ocr(digest, version)
+    if cached is not None:
+        print("Texte OCR réutilisé (image et profil de crop inchangés)")
+        # Seul le suffixe (panneau Split View) est gardé en cache : le fichier peut avoir changé de nom.
+        # Aucun OCR mesuré : durée NULL dans l'historique (ne fausse pas les moyennes de durée OCR)
+        return [dict(row, image=filename + row["image"], detect_seconds=detect_seconds, ocr_seconds=None, ocr_cached=True)
+                for row in cached]
+    rows = [dict(row, digest=digest, crop_version=version) for row in _extract_detected(img_path, device_info, detect_seconds)]
+    cache.put_ocr(digest, version, device_info["device"], device_info["source"],
+                  [dict(row, image=row["image"][len(filename):]) for row in rows])
+    return rows
+
+
+def _extract_detected(img_path, device_info, detect_seconds):
+    # Étape 2 (OCR) d'une image dont le device/type est connu et supporté
+    filename = os.path.basename(img_path)
+    device_type = f"{device_info['device']} {device_info['orientation']} {device_info['source']}"
+    # Ouverte une seule fois pour le test Split View et la cascade : chacun ne décode que ce qu'il lit
+    img = LazyImage(img_path)
+    if device_info["device"].startswith("iPad"):
+        panes = process_split_screen(img_path, device_info, detect_seconds, img=img)
+        if panes:
+            return panes
+    # Une image déjà réduite à un panneau (orientation '_split') garde le profil de son orientation propre
+    crop_info = dict(device_info, orientation=device_info["orientation"].replace("_split", ""))
+    start = time.perf_counter()
+    result = run_image_cascade(img_path, crop_info, img=img)
+    ocr_seconds = time.perf_counter() - start
+    text = cascade_text(result)
+    print(f"Texte extrait : {text}")
+    return [dict(
+        {"image": filename, "device_type": device_type, "extracted_text": text},
+        **_ocr_details(device_info, result, detect_seconds, ocr_seconds),
+    )]
+
+
+def _ocr_details(device_info, result, detect_seconds, ocr_seconds):
+    # Détail d'une ligne OCR gardé pour l'historique des exécutions (colonnes ignorées par les CSV)
+    return {
+        "device": device_info["device"],
+        "orientation": device_info["orientation"],
+        "source": device_info["source"],
+        "crop_box": result.box,
+        "strategy": result.strategy,
+        "confidence": result.confidence,
+        "detect_seconds": detect_seconds,
+        "ocr_seconds": ocr_seconds,
+    }
+
+
+def process_split_screen(img_path, device_info, detect_seconds=0.0, img=None):
+    """
+    Détecte le séparateur Split View et extrait les deux panneaux en parallèle,
+    chacun avec son propre profil de crop (orientation du panneau).
+    L'image n'est décodée en entier que si un séparateur est trouvé sur l'aperçu (LazyImage).
+
+    Returns:
+        list: Une ligne par panneau, ou liste vide si l'image n'est pas en Split View.
+    """
+    if img is None:
+        img = LazyImage(img_path)
+    panes = split_panes(img)
+    if not panes:
+        return []
+    filename = os.path.basename(img_path)
+    root, ext = os.path.splitext(filename)
+
+    def extract_pane(pane):
+        name, array = pane
+        orientation = pane_orientation(array)
+        pane_info = dict(device_info, orientation=orientation)
+        # Le panneau est une vue sur l'image décodée : pas de second décodage ni de copie complète
+        start = time.perf_counter()
+        result = run_image_cascade(f"{root}_{name}{ext}", pane_info, img=FrameImage(array))
+        ocr_seconds = time.perf_counter() - start
+        text = cascade_text(result)
+        print(f"Texte extrait ({name}) : {text}")
+        return dict(
+            {
+                "image": f"{filename}#{name}",
+                "device_type": f"{device_info['device']} {orientation}_split {device_info['source']}",
+                "extracted_text": text,
+            },
+            **_ocr_details(dict(device_info, orientation=f"{orientation}_split"), result, detect_seconds, ocr_seconds),
+        )
+
+    with ThreadPoolExecutor(max_workers=len(panes)) as pool:
+        return list(pool.map(extract_pane, panes))
+
+
+def _ocr_task(img_path, cache=None, digest=None):
+    # Tâche exécutée dans un worker : renvoie aussi les statistiques de cascade du worker
+    return extract_file_text(img_path, cache=cache, digest=digest), drain_cascade_stats()
+
+
+def _pipeline_task(img_path, api_key, search_fn=None, cache=None, digest=None):
+    rows, stats = _ocr_task(img_path, cache, digest)
+    return [search_text(row, api_key, search_fn=search_fn) for row in rows], stats
+
+
+def _expand_duplicates(group, task_rows):
+    # Les doublons réutilisent le résultat du premier fichier identique (suffixe de panneau/horodatage conservé)
+    first = os.path.basename(group[0])
+    return [dict(row, image=os.path.basename(p) + row["image"][len(first):]) for row in task_rows for p in group]
+
+
+def _run_deduplicated(paths, task, workers, *args, on_result=None):
+    """
+    Exécute `task` une seule fois par contenu distinct (en parallèle si workers > 1),
+    les fichiers les moins coûteux et les plus susceptibles de donner un résultat en premier.
+    `on_result(rows)` est appelé dès qu'un fichier est terminé (ordre de fin de traitement) ;
+    le retour contient toutes les lignes dans l'ordre de `paths`, puis dans l'ordre des lignes de
+    chaque fichier (panneaux, horodatages des vidéos).
     """
-    with open(log_path, "a", encoding="utf-8") as f:
-        # Récupère la date et l'heure courante pour le log
-        now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        # Écrit une ligne formatée avec toutes les infos importantes
-        f.write(f"[{now}] IMAGE: {info['image']} | TYPE: {info['device_type']} | TEXTE: {info['extracted_text']} | YOUTUBE: {info['youtube_url']}\n")
+    by_digest = group_duplicates(paths)
+    groups = {g[0]: g for g in by_digest.values()}
+    # Empreinte du premier fichier de chaque groupe, transmise à la tâche (fichier lu une seule fois)
+    digests = {g[0]: digest for digest, g in by_digest.items()}
+    ordered = schedule(list(groups))
+    position = {}
+    for index, path in enumerate(paths):
+        position.setdefault(path, index)
+    keyed = []
+
+    def collect(first, output):
+        task_rows, stats = output
+        merge_cascade_stats(stats)
+        done = _expand_duplicates(groups[first], task_rows)
+        # Même ordre que _expand_duplicates : ligne du fichier, puis chemin du groupe
+        keys = [(position[p], i) for i in range(len(task_rows)) for p in groups[first]]
+        keyed.extend(zip(keys, done))
+        if on_result and done:
+            on_result(done)
+
+    if workers > 1:
+        with get_ocr_pool(workers) as pool:
+            # Soumission dans l'ordre de priorité, récupération dans l'ordre de fin
+            futures = {pool.submit(task, first, *args, digest=digests[first]): first for first in ordered}
+            for future in as_completed(futures):
+                collect(futures[future], future.result())
+    else:
+        for first in ordered:
+            collect(first, task(first, *args, digest=digests[first]))
+    keyed.sort(key=lambda item: item[0])
+    return [row for _, row in keyed]
+
+
+def _print_reuse(rows):
+    # Bilan de la réévaluation incrémentale : lignes dont l'OCR a été réutilisé
+    reused = sum(1 for r in rows if r.get("ocr_cached"))
+    if reused:
+        print(f"\nOCR réutilisé pour {reused}/{len(rows)} ligne(s) (image et profil de crop inchangés)")
+
+
+def run_ocr_stage(input_dir, output_csv="ocr_results.csv", workers=1, on_result=None, cache_db=EVAL_CACHE_DB):
+    """
+    Étape 'ocr' seule : détection + OCR de toutes les images d'un dossier, résultats dans un CSV
+    (texte et détail OCR, repris par l'étape 'search' pour l'historique des exécutions).
+    `on_result(rows)` reçoit les lignes de chaque fichier dès qu'il est terminé.
+    Avec `cache_db` (None pour le désactiver), seules les images nouvelles ou dont le profil de crop
+    a changé repassent à l'OCR.
+    """
+    cache = EvalCache(cache_db) if cache_db else None
+    rows = _run_deduplicated(list_inputs(input_dir), _ocr_task, workers, cache, on_result=on_result)
+    _print_reuse(rows)
+    write_ocr_csv(rows, output_csv)
+    log_cascade_stats()
+    return rows
+
+
+def run_pipeline(input_dir, output_csv="main_pipeline_results.csv", api_key=None, workers=1, on_result=None, search_fn=None,
+                 history_db=HISTORY_DB, cache_db=EVAL_CACHE_DB):
+    """
+    Pipeline complète sur un dossier : détection, OCR, recherche YouTube, CSV + logs.
+    Les fichiers identiques ne sont traités qu'une fois ; avec workers > 1 les images
+    sont traitées en parallèle dans des processus OCR dont les modèles restent chargés.
+    Les images peu coûteuses passent en premier et `on_result(rows)` reçoit leurs lignes
+    dès qu'elles sont prêtes ; le CSV reste écrit dans l'ordre des noms de fichiers.
+    `search_fn` remplace search_youtube_api ; il est envoyé aux workers, il doit donc être picklable
+    (fonction de module ou search_backends.HedgedSearch).
+    Chaque ligne (device, source, crop, texte, durées, résultat) est ajoutée à l'historique `history_db`
+    (None pour ne rien enregistrer).
+    Avec `cache_db` (None pour le désactiver), une nouvelle exécution ne refait que l'étape touchée :
+    OCR des seules images dont le profil de crop (groupe device/source) a changé, et refiltrage des
+    réponses brutes déjà reçues quand seule la liste noire a changé (aucun appel API).
+
+    Returns:
+        list: Lignes avec un résultat YouTube, dans l'ordre des noms de fichiers.
+    """
+    cache = EvalCache(cache_db) if cache_db else None
+    if search_fn is None and cache is not None:
+        search_fn = RawCachedSearch(cache)
+    rows = _run_deduplicated(list_inputs(input_dir), _pipeline_task, workers, api_key, search_fn, cache, on_result=on_result)
+    _print_reuse(rows)
+    for row in rows:
+        log_full(row)
+    if history_db:
+        record_run(rows, command="pipeline", db_path=history_db)
+    results = [r for r in rows if r["youtube_title"]]
+    # Sauvegarde des résultats dans un fichier CSV
+    write_csv(results, output_csv, RESULT_FIELDS)
+    # Taux de réussite et coût de chaque stratégie de crop, pour ajuster l'ordre de la cascade
+    log_cascade_stats()
+    print(f"\nPipeline terminé. Résultats enregistrés dans {output_csv}, main_pipeline.log, crop_cascade.log"
+          f"{' et ' + history_db if history_db else ''}")
+    return results
 
 
 def main():
@@ -87,95 +412,7 @@ def main():
         # Affiche une erreur et arrête le script si la clé est absente
         print("Erreur : Variable d'environnement YT_API_KEY absente.")
         sys.exit(1)
-
-    results = []  # Liste pour stocker les résultats finaux
-    # Parcourt tous les fichiers du dossier screenshots
-    for filename in sorted(os.listdir(screenshots_dir)):
-        # Vérifie que le fichier est une image supportée
-        if filename.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp')):
-            img_path = os.path.join(screenshots_dir, filename)
-            print(f"\n=== Traitement de {filename} ===")
-
-            # 1. Détection du device, de l'orientation et du type/source
-            info = analyze_image(img_path)
-            device = info["device"]
-            orientation = info["orientation"]
-            source = info["source"]
-
-            # Tri 1 : vérifie si le device est connu
-            device_known = any(d["device"] == device for d in DEVICE_IMAGE_TYPES)
-            if not device_known:
-                print(f"Appareil non reconnu : {device}. Fichier ignoré.")
-                continue
-
-            # Tri 2 : vérifie si la combinaison device/orientation/source est supportée
-            match = next((d for d in DEVICE_IMAGE_TYPES if d["device"] == device and d["orientation"] == orientation and d["source"] == source), None)
-            if not match:
-                print(f"Type d'image/source non reconnu pour {device}, {orientation}, {source}. Fichier ignoré.")
-                continue
-
-            # Si tout est OK, construit la chaîne de type
-            device_type = f"{device} {orientation} {source}"
-            print(f"Type détecté : {device_type}")
-
-            # 2. OCR avec crop adapté au device/type
-            extracted_text = process_image(img_path, device_type)
-            print(f"Texte extrait : {extracted_text}")
-
-            if not extracted_text.strip():
-                # Si aucun texte n'est extrait, log et passe au suivant
-                print("→ Aucun texte extrait, passage au suivant.")
-                log_full({
-                    "image": filename,
-                    "device_type": device_type,
-                    "extracted_text": "",
-                    "youtube_title": "",
-                    "youtube_url": "AUCUN RESULTAT"
-                })
-                continue
-
-            # 3. Recherche musicale YouTube (requête enrichie)
-            query = f"{extracted_text} music hq"
-            music_results = search_youtube_api(query, api_key=YT_API_KEY)
-            if not music_results:
-                # Si aucun résultat, log et passe au suivant
-                print("→ Aucun résultat musical trouvé.")
-                log_full({
-                    "image": filename,
-                    "device_type": device_type,
-                    "extracted_text": extracted_text,
-                    "youtube_title": "",
-                    "youtube_url": "AUCUN RESULTAT"
-                })
-                continue
-
-            # Prend le meilleur résultat YouTube
-            best = music_results[0]
-            print(f"Meilleur résultat YouTube : {best['title']} → {best['url']}")
-
-            # Ajoute le résultat à la liste finale et log
-            results.append({
-                "image": filename,
-                "device_type": device_type,
-                "extracted_text": extracted_text,
-                "youtube_title": best["title"],
-                "youtube_url": best["url"]
-            })
-            log_full({
-                "image": filename,
-                "device_type": device_type,
-                "extracted_text": extracted_text,
-                "youtube_title": best["title"],
-                "youtube_url": best["url"]
-            })
-
-    # Sauvegarde des résultats dans un fichier CSV
-    output_csv = "main_pipeline_results.csv"
-    with open(output_csv, "w", newline='', encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=["image", "device_type", "extracted_text", "youtube_title", "youtube_url"])
-        writer.writeheader()
-        writer.writerows(results)
-    print(f"\nPipeline terminé. Résultats enregistrés dans {output_csv} et main_pipeline.log")
+    run_pipeline(screenshots_dir, api_key=YT_API_KEY)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,119 @@
+"""
+Module metadata_probe.py
+Pré-classification rapide d'une image à partir de ses seules métadonnées (en-tête du fichier).
+
+On lit uniquement les premiers Ko du fichier (PROBE_BYTES) : dimensions (IHDR pour PNG, SOFn pour JPEG),
+bloc EXIF (eXIf / APP1) et XMP (iTXt / APP1). Cela suffit pour :
+- rejeter les photos d'appareil photo (bloc EXIF de prise de vue : ouverture, exposition, objectif...),
+- reconnaître les screenshots iOS (UserComment 'Screenshot', absence de bloc appareil photo),
+- connaître le modèle (tag Model) et les dimensions sans décoder un seul pixel.
+L'analyse d'un dossier devient ainsi limitée par les E/S et non plus par le CPU.
+"""
+
+import io
+import re
+import struct
+
+# Nombre d'octets lus en tête de fichier (EXIF/XMP des screenshots iOS tiennent largement dedans)
+PROBE_BYTES = 64 * 1024
+
+# Tags EXIF présents uniquement sur les photos prises avec un appareil photo
+CAMERA_TAGS = ("EXIF FNumber", "EXIF ExposureTime", "EXIF ISOSpeedRatings", "EXIF FocalLength", "EXIF LensModel")
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# Marqueurs JPEG "Start Of Frame" contenant les dimensions
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+XMP_JPEG_HEADER = b"http://ns.adobe.com/xap/1.0/\x00"
+
+_USER_COMMENT_XMP = re.compile(rb"<exif:UserComment>\s*(?:<rdf:Alt>\s*<rdf:li[^>]*>)?\s*([^<]*)")
+
+
+def _parse_png(data):
+    """Retourne (largeur, hauteur, exif_tiff, xmp) à partir des chunks PNG précédant IDAT."""
+    width = height = exif = xmp = None
+    pos = len(PNG_SIGNATURE)
+    while pos + 8 <= len(data):
+        length, ctype = struct.unpack(">I4s", data[pos:pos + 8])
+        body = data[pos + 8:pos + 8 + length]
+        if ctype == b"IHDR":
+            width, height = struct.unpack(">II", body[:8])
+        elif ctype == b"eXIf":
+            exif = body
+        elif ctype in (b"iTXt", b"tEXt") and body.startswith(b"XML:com.adobe.xmp"):
+            xmp = body
+        elif ctype == b"IDAT":
+            break
+        pos += 12 + length
+    return width, height, exif, xmp
+
+
+def _parse_jpeg(data):
+    """Retourne (largeur, hauteur, exif_tiff, xmp) à partir des segments JPEG précédant SOS."""
+    width = height = exif = xmp = None
+    pos = 2
+    while pos + 4 <= len(data) and data[pos] == 0xFF:
+        marker = data[pos + 1]
+        if marker == 0xDA:  # Start Of Scan : les données image commencent
+            break
+        length = struct.unpack(">H", data[pos + 2:pos + 4])[0]
+        body = data[pos + 4:pos + 2 + length]
+        if marker == 0xE1 and body.startswith(b"Exif\x00\x00"):
+            exif = body[6:]
+        elif marker == 0xE1 and body.startswith(XMP_JPEG_HEADER):
+            xmp = body[len(XMP_JPEG_HEADER):]
+        elif marker in JPEG_SOF_MARKERS and len(body) >= 5:
+            height, width = struct.unpack(">HH", body[1:5])
+        pos += 2 + length
+    return width, height, exif, xmp
+
+
+def _read_exif(tiff):
+    """Décode un bloc EXIF (en-tête TIFF) avec exifread ; retourne {nom_tag: valeur texte}."""
+    if not tiff:
+        return {}
+    # Import différé : exifread n'est utile que si un bloc EXIF est présent
+    import exifread
+    tags = exifread.process_file(io.BytesIO(tiff), details=False)
+    return {k: str(v).strip() for k, v in tags.items() if "Thumbnail" not in k}
+
+
+def probe_metadata(path, probe_bytes=PROBE_BYTES):
+    """
+    Classe un fichier image à partir de son en-tête uniquement.
+
+    Args:
+        path (str): Chemin de l'image.
+        probe_bytes (int): Nombre d'octets lus en tête de fichier.
+
+    Returns:
+        dict: {"kind": "screenshot" | "photo" | "unknown", "width", "height", "model", "software", "reason"}.
+              width/height valent None si l'en-tête ne suffit pas (format non géré, en-tête tronqué).
+    """
+    with open(path, "rb") as f:
+        data = f.read(probe_bytes)
+    if data.startswith(PNG_SIGNATURE):
+        width, height, exif, xmp = _parse_png(data)
+    elif data.startswith(b"\xff\xd8"):
+        width, height, exif, xmp = _parse_jpeg(data)
+    else:
+        return {"kind": "unknown", "width": None, "height": None, "model": None, "software": None, "reason": "format non géré"}
+
+    tags = _read_exif(exif)
+    model = tags.get("Image Model")
+    software = tags.get("Image Software")
+    user_comment = tags.get("EXIF UserComment", "")
+    if not user_comment and xmp:
+        match = _USER_COMMENT_XMP.search(xmp)
+        user_comment = match.group(1).decode("utf-8", "ignore").strip() if match else ""
+
+    camera = [t for t in CAMERA_TAGS if t in tags]
+    if user_comment.lower() == "screenshot":
+        kind, reason = "screenshot", "UserComment = Screenshot"
+    elif camera:
+        kind, reason = "photo", f"bloc EXIF appareil photo ({', '.join(camera)})"
+    elif exif is not None:
+        # EXIF présent mais sans aucun tag de prise de vue : typique d'une capture d'écran iOS
+        kind, reason = "screenshot", "EXIF sans bloc appareil photo"
+    else:
+        kind, reason = "unknown", "aucune métadonnée EXIF"
+    return {"kind": kind, "width": width, "height": height, "model": model, "software": software, "reason": reason}
@@ -1,9 +1,33 @@
 import os
-from googleapiclient.discovery import build
 import datetime
+import hashlib
 import re
+import threading
+from collections import OrderedDict
 
-def search_youtube_api(query, api_key, max_results=5):
+# Nombre maximal de requêtes gardées par cache de recherche (LRU)
+SEARCH_CACHE_SIZE = 1024
+
+# Liste noire de mots/phrases à éviter (titre ou description)
+BLACKLIST = [
+    r"official\s*video", r"clip officiel", r"vidéo officielle",
+    r"lyrics?", r"paroles?", r"karaok[eé]", r"cover",
+    r"remix", r"live", r"direct", r"concert", r"émission",
+    r"making of", r"audio\s*officiel", r"visualiser", r"visualizer", r"instrumental", r"film"
+]
+_BLACKLIST_PATTERN = re.compile('|'.join(BLACKLIST), re.IGNORECASE)
+
+def fetch_youtube_api(query, api_key, max_results=5):
+    """
+    Réponse brute de l'API YouTube (catégorie Musique), avant tout filtrage.
+    Gardée telle quelle dans le cache de réévaluation : un changement de liste noire
+    se rejoue sur ces réponses sans nouvel appel API.
+
+    Returns:
+        list: Liste de {"platform", "title", "description", "url"}.
+    """
+    # Import différé : googleapiclient est lourd et inutile pour les étapes sans recherche
+    from googleapiclient.discovery import build
     youtube = build("youtube", "v3", developerKey=api_key)
     request = youtube.search().list(
         part="snippet",
@@ -19,11 +43,49 @@ def search_youtube_api(query, api_key, max_results=5):
         description = item["snippet"].get("description", "")
         video_id = item["id"]["videoId"]
         url = f"https://www.youtube.com/watch?v={video_id}"
-        if is_valid_music_result(title, description):
-            results.append({"platform": "YouTube", "title": title, "url": url})
+        results.append({"platform": "YouTube", "title": title, "description": description, "url": url})
     return results
 
 
+def filter_music_results(results):
+    """Garde les résultats qui passent is_valid_music_result (titre et description), sans la description."""
+    return [
+        {"platform": r["platform"], "title": r["title"], "url": r["url"]}
+        for r in results if is_valid_music_result(r["title"], r.get("description"))
+    ]
+
+
+def search_youtube_api(query, api_key, max_results=5):
+    return filter_music_results(fetch_youtube_api(query, api_key, max_results=max_results))
+
+
+def cached_search(search_fn, max_size=SEARCH_CACHE_SIZE):
+    """
+    Enveloppe une fonction de recherche (query, api_key=..., max_results=...) d'un cache LRU par requête :
+    un même texte OCR (screenshot renvoyé, doublon) ne consomme qu'une fois le quota de l'API.
+
+    Returns:
+        callable: Fonction de même signature que search_fn, sûre entre threads.
+    """
+    cache = OrderedDict()
+    lock = threading.Lock()
+
+    def search(query, api_key=None, max_results=5):
+        key = (query, max_results)
+        with lock:
+            if key in cache:
+                cache.move_to_end(key)
+                return list(cache[key])
+        results = search_fn(query, api_key=api_key, max_results=max_results)
+        with lock:
+            cache[key] = list(results)
+            while len(cache) > max_size:
+                cache.popitem(last=False)
+        return results
+
+    return search
+
+
 def log_url(result):
     now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     with open("music_search.log", "a", encoding="utf-8") as f:
@@ -31,21 +93,18 @@ def log_url(result):
             f.write(f"[{now}] [{r['platform']}] {r['title']} -> {r['url']}\n")
 
 def is_valid_music_result(title, description=None):
-    # Liste noire de mots/phrases à éviter
-    blacklist = [
-        r"official\s*video", r"clip officiel", r"vidéo officielle",
-        r"lyrics?", r"paroles?", r"karaok[eé]", r"cover",
-        r"remix", r"live", r"direct", r"concert", r"émission",
-        r"making of", r"audio\s*officiel", r"visualiser", r"visualizer", r"instrumental", r"film"
-    ]
-    pattern = re.compile('|'.join(blacklist), re.IGNORECASE)
     # On filtre sur le titre et la description
-    if pattern.search(title):
+    if _BLACKLIST_PATTERN.search(title):
         return False
-    if description and pattern.search(description):
+    if description and _BLACKLIST_PATTERN.search(description):
         return False
     return True
 
+
+def filter_version():
+    """Empreinte de la liste noire : change dès qu'une entrée est ajoutée, retirée ou modifiée."""
+    return hashlib.blake2b("|".join(BLACKLIST).encode("utf-8"), digest_size=8).hexdigest()
+
 def best_music_result(results, query):
     """
     Retourne le résultat le plus pertinent parmi les résultats valides.
@@ -0,0 +1,353 @@
+"""
+Module ocr_engine.py
+Point d'entrée unique pour tous les appels OCR de la pipeline.
+
+Fonctionnalités :
+- Détection du script (latin, arabe, cyrillique...) sur le crop via l'OSD de Tesseract,
+  afin de choisir le jeu de langues minimal pour chaque image (au lieu de 'eng+fra+ara' partout).
+  Un titre/artiste compte rarement les 50 caractères exigés par défaut par l'OSD : le seuil est abaissé
+  (OSD_MIN_CHARACTERS) ; si l'OSD reste indéterminé, le script est voté sur les plages Unicode
+  d'une première lecture avec toutes les langues installées
+- Cache des résultats OCR dont la clé inclut toujours la langue choisie
+- Modèles de langue gardés "chauds" dans chaque worker OCR (via tesserocr si disponible,
+  sinon repli sur pytesseract qui relance un processus tesseract à chaque appel)
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import pytesseract
+
+try:
+    # tesserocr garde les modèles chargés en mémoire entre deux appels (optionnel)
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+# Langue utilisée quand le script ne peut pas être détecté
+DEFAULT_LANG = "eng"
+
+# Jeu de langues minimal par script détecté par l'OSD de Tesseract
+SCRIPT_LANGS = {
+    "Latin": "eng+fra",  # titres anglais/français, interface iOS en français
+    "Arabic": "ara",
+    "Cyrillic": "rus",
+    "Greek": "ell",
+    "Hebrew": "heb",
+}
+
+# En dessous de cette confiance, le script détecté par l'OSD est ignoré
+MIN_SCRIPT_CONF = 1.0
+# Nombre minimal de caractères pour tenter l'OSD (défaut Tesseract : 50, trop pour un titre/artiste)
+OSD_MIN_CHARACTERS = 5
+
+# Plages Unicode des lettres de chaque script (vote de repli quand l'OSD est indéterminé)
+SCRIPT_RANGES = {
+    "Latin": ((0x41, 0x5A), (0x61, 0x7A), (0xC0, 0x24F)),
+    "Greek": ((0x370, 0x3FF),),
+    "Cyrillic": ((0x400, 0x4FF),),
+    "Hebrew": ((0x590, 0x5FF),),
+    "Arabic": ((0x600, 0x6FF), (0x750, 0x77F)),
+}
+
+# Nombre maximal d'entrées gardées dans chaque cache (LRU)
+OCR_CACHE_SIZE = 512
+
+_ocr_cache = OrderedDict()
+_data_cache = OrderedDict()
+_lang_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+# Modèles tesserocr chargés dans le processus courant (un par jeu de langues)
+_apis = {}
+_api_lock = threading.Lock()
+
+_installed_langs = None
+
+# Nombre d'appels réels à Tesseract (OSD + OCR, hors cache) dans le processus courant
+_tesseract_calls = 0
+
+
+def image_digest(img):
+    """
+    Calcule une empreinte stable du contenu d'une image PIL (pixels + taille + mode).
+    Sert de base aux clés de cache OCR.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{img.mode}:{img.size[0]}x{img.size[1]}".encode())
+    h.update(img.tobytes())
+    return h.hexdigest()
+
+
+def _cache_get(cache, key):
+    with _cache_lock:
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
+    return None
+
+
+def _cache_put(cache, key, value):
+    with _cache_lock:
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > OCR_CACHE_SIZE:
+            cache.popitem(last=False)
+
+
+def _count_call():
+    global _tesseract_calls
+    with _cache_lock:
+        _tesseract_calls += 1
+
+
+def tesseract_call_count():
+    """Nombre d'appels réels à Tesseract (hors cache) depuis le début du processus."""
+    with _cache_lock:
+        return _tesseract_calls
+
+
+def clear_caches():
+    """Vide les caches OCR et de détection de langue."""
+    with _cache_lock:
+        _ocr_cache.clear()
+        _data_cache.clear()
+        _lang_cache.clear()
+
+
+def installed_languages():
+    """
+    Retourne l'ensemble des langues Tesseract installées (mis en cache pour le processus).
+    Retourne None si la liste ne peut pas être obtenue.
+    """
+    global _installed_langs
+    if _installed_langs is None:
+        try:
+            _installed_langs = set(pytesseract.get_languages(config=""))
+        except (pytesseract.TesseractNotFoundError, pytesseract.TesseractError, OSError):
+            return None
+    return _installed_langs
+
+
+def _restrict_to_installed(lang):
+    """Retire du jeu de langues celles qui ne sont pas installées (repli sur DEFAULT_LANG)."""
+    installed = installed_languages()
+    if installed is None:
+        return lang
+    kept = [l for l in lang.split("+") if l in installed]
+    return "+".join(kept) if kept else DEFAULT_LANG
+
+
+def candidate_langs():
+    """Jeux de langues réellement utilisables (SCRIPT_LANGS et DEFAULT_LANG restreints aux langues installées)."""
+    return {_restrict_to_installed(lang) for lang in list(SCRIPT_LANGS.values()) + [DEFAULT_LANG]}
+
+
+def _get_osd_api():
+    """Moteur tesserocr gardé chargé pour l'OSD (modèle 'osd', mode OSD seul)."""
+    with _api_lock:
+        api = _apis.get("osd")
+        if api is None:
+            api = tesserocr.PyTessBaseAPI(lang="osd", psm=tesserocr.PSM.OSD_ONLY)
+            api.SetVariable("min_characters_to_try", str(OSD_MIN_CHARACTERS))
+            _apis["osd"] = api
+        return api
+
+
+def _run_osd(img):
+    """OSD réel : (script, confiance) ou (None, 0.0) si Tesseract n'a pas pu conclure."""
+    _count_call()
+    if tesserocr is not None:
+        try:
+            api = _get_osd_api()
+        except RuntimeError:
+            # Modèle 'osd' absent : repli sur pytesseract (qui échouera de la même façon, proprement)
+            api = None
+        if api is not None:
+            with _api_lock:
+                api.SetImage(img)
+                osd = api.DetectOrientationScript()
+            if not osd:
+                return None, 0.0
+            return osd.get("script_name"), osd.get("script_conf", 0.0)
+    try:
+        osd = pytesseract.image_to_osd(img, config=f"-c min_characters_to_try={OSD_MIN_CHARACTERS}",
+                                       output_type=pytesseract.Output.DICT)
+    except (pytesseract.TesseractError, pytesseract.TesseractNotFoundError):
+        return None, 0.0
+    return osd.get("script"), osd.get("script_conf", 0)
+
+
+def vote_script(text):
+    """
+    Script majoritaire des lettres d'un texte, d'après leurs plages Unicode (SCRIPT_RANGES).
+
+    Returns:
+        str ou None: Nom du script, ou None si le texte ne contient aucune lettre reconnue.
+    """
+    votes = {}
+    for char in text:
+        code = ord(char)
+        for script, ranges in SCRIPT_RANGES.items():
+            if any(lo <= code <= hi for lo, hi in ranges):
+                votes[script] = votes.get(script, 0) + 1
+                break
+    return max(votes, key=votes.get) if votes else None
+
+
+def detect_script(img):
+    """
+    Détecte le script dominant d'un crop : OSD de Tesseract (seuil de caractères abaissé), puis,
+    si l'OSD est indéterminé, vote Unicode sur une lecture avec toutes les langues installées.
+
+    Returns:
+        str ou None: Nom du script ('Latin', 'Arabic', 'Cyrillic'...) ou None si indéterminé
+        (aucun texte lisible).
+    """
+    script, conf = _run_osd(img)
+    if script and conf >= MIN_SCRIPT_CONF:
+        return script
+    # Une lecture 'eng' seule transcrirait un titre arabe ou cyrillique en lettres latines :
+    # le vote se fait sur une lecture avec toutes les langues candidates
+    combined = "+".join(sorted({l for lang in candidate_langs() for l in lang.split("+")}))
+    return vote_script(ocr_image(img, lang=combined))
+
+
+def detect_lang(img, digest=None):
+    """
+    Choisit le jeu de langues minimal pour un crop, d'après le script détecté.
+    Le résultat est mis en cache par contenu d'image.
+
+    Args:
+        img (PIL.Image): Image (idéalement déjà croppée) à analyser.
+        digest (str, optionnel): Empreinte déjà calculée de l'image.
+
+    Returns:
+        str: Langue(s) Tesseract, ex: 'eng+fra' ou 'ara'.
+    """
+    candidates = candidate_langs()
+    if len(candidates) == 1:
+        # Un seul jeu de langues installé (ex: image avec 'eng' seul) : l'OSD ne changerait rien
+        return next(iter(candidates))
+    digest = digest or image_digest(img)
+    cached = _cache_get(_lang_cache, digest)
+    if cached is not None:
+        return cached
+    script = detect_script(img)
+    lang = _restrict_to_installed(SCRIPT_LANGS.get(script, DEFAULT_LANG))
+    _cache_put(_lang_cache, digest, lang)
+    return lang
+
+
+def _get_api(lang):
+    """Retourne (et garde en mémoire) un moteur tesserocr déjà initialisé pour ce jeu de langues."""
+    with _api_lock:
+        api = _apis.get(lang)
+        if api is None:
+            api = tesserocr.PyTessBaseAPI(lang=lang)
+            _apis[lang] = api
+        return api
+
+
+def _run_ocr(img, lang, config):
+    """Lance réellement l'OCR (tesserocr si disponible et sans config spécifique, sinon pytesseract)."""
+    _count_call()
+    if tesserocr is not None and not config:
+        api = _get_api(lang)
+        with _api_lock:
+            api.SetImage(img)
+            return api.GetUTF8Text()
+    return pytesseract.image_to_string(img, lang=lang, config=config)
+
+
+def ocr_image(img, lang=None, config=""):
+    """
+    OCR d'une image avec cache. Si `lang` est None, la langue est choisie automatiquement
+    selon le script détecté sur l'image.
+
+    Args:
+        img (PIL.Image): Image (croppée ou non) à lire.
+        lang (str, optionnel): Langue(s) Tesseract imposée(s) ; None = détection automatique.
+        config (str): Options supplémentaires passées à Tesseract.
+
+    Returns:
+        str: Texte brut extrait.
+    """
+    digest = image_digest(img)
+    if lang is None:
+        lang = detect_lang(img, digest=digest)
+    key = (digest, lang, config)
+    cached = _cache_get(_ocr_cache, key)
+    if cached is not None:
+        return cached
+    text = _run_ocr(img, lang, config)
+    _cache_put(_ocr_cache, key, text)
+    return text
+
+
+def _run_ocr_data(img, lang, config):
+    """OCR mot à mot : retourne (texte reconstruit ligne par ligne, confiance moyenne des mots)."""
+    _count_call()
+    if tesserocr is not None and not config:
+        api = _get_api(lang)
+        with _api_lock:
+            api.SetImage(img)
+            return api.GetUTF8Text(), float(api.MeanTextConf())
+    data = pytesseract.image_to_data(img, lang=lang, config=config, output_type=pytesseract.Output.DICT)
+    lines = OrderedDict()
+    confs = []
+    for i, word in enumerate(data["text"]):
+        conf = float(data["conf"][i])
+        # conf == -1 : bloc/ligne sans mot reconnu
+        if conf < 0 or not word.strip():
+            continue
+        confs.append(conf)
+        key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+        lines.setdefault(key, []).append(word)
+    text = "\n".join(" ".join(words) for words in lines.values())
+    return text, (sum(confs) / len(confs) if confs else 0.0)
+
+
+def ocr_data(img, lang=None, config=""):
+    """
+    Comme ocr_image, mais retourne aussi la confiance moyenne (0-100) des mots reconnus
+    par Tesseract (image_to_data). Sert à décider s'il faut élargir la zone de crop.
+
+    Returns:
+        tuple: (texte, confiance_moyenne)
+    """
+    digest = image_digest(img)
+    if lang is None:
+        lang = detect_lang(img, digest=digest)
+    key = (digest, lang, config)
+    cached = _cache_get(_data_cache, key)
+    if cached is not None:
+        return cached
+    result = _run_ocr_data(img, lang, config)
+    _cache_put(_data_cache, key, result)
+    return result
+
+
+def init_ocr_worker(langs=None):
+    """
+    Initialiseur des workers OCR : charge à l'avance les modèles de langue
+    pour qu'ils restent chauds pendant toute la vie du processus.
+    """
+    if tesserocr is None:
+        return
+    for lang in langs or [DEFAULT_LANG]:
+        _get_api(_restrict_to_installed(lang))
+
+
+def get_ocr_pool(workers, langs=None):
+    """
+    Crée un pool de processus OCR dont chaque worker garde ses modèles de langue chargés.
+
+    Args:
+        workers (int): Nombre de processus.
+        langs (list, optionnel): Jeux de langues à précharger (par défaut : tous ceux de SCRIPT_LANGS).
+    """
+    langs = langs or sorted(set(SCRIPT_LANGS.values()) | {DEFAULT_LANG})
+    return ProcessPoolExecutor(max_workers=workers, initializer=init_ocr_worker, initargs=(langs,))
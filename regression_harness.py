@@ -0,0 +1,225 @@
+"""
+Module regression_harness.py
+Banc de non-régression : précision OCR/recherche et débit mesurés ensemble sur un corpus étiqueté.
+
+Le corpus (golden_corpus.json) associe chaque screenshot à son titre/artiste attendu et à la vidéo
+attendue. Il est complété par des frames synthétiques rendues avec Pillow pour chaque résolution
+de DEVICE_RESOLUTIONS (titre/artiste dessinés dans la zone de get_crop_box).
+La pipeline complète est exécutée (détection, cascade de crops, OCR, recherche), avec une recherche
+simulée sur un catalogue local (pas d'appel API). Le rapport donne côte à côte la précision, le nombre
+d'appels Tesseract par image et le temps par image ; comparé à un rapport de référence, il échoue
+si une optimisation de vitesse fait baisser la précision au-delà d'un seuil.
+
+Usage :
+    python regression_harness.py [--corpus golden_corpus.json] [--no-synthetic]
+                                 [--report rapport.json] [--baseline reference.json] [--max-drop 0.02]
+"""
+
+import argparse
+import difflib
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+
+from PIL import Image, ImageDraw, ImageFont
+
+from device_image_types import DEVICE_RESOLUTIONS
+from search_backends import LocalCatalogBackend
+from where_to_crop import get_crop_box
+
+# Corpus étiqueté par défaut (chemins d'images relatifs à ce fichier)
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden_corpus.json")
+# Similarité minimale (0-1) entre texte extrait et titre/artiste attendus pour compter le texte comme correct
+TEXT_MATCH_RATIO = 0.8
+# Part minimale des mots d'une entrée du catalogue présents dans la requête pour que le stub la retourne
+STUB_MIN_SCORE = 0.5
+# Baisse de précision tolérée par rapport au rapport de référence
+DEFAULT_MAX_DROP = 0.02
+
+# Morceaux dessinés sur les frames synthétiques (un par résolution, en boucle)
+SYNTHETIC_SONGS = [
+    ("Midnight City", "M83"),
+    ("La Bohème", "Charles Aznavour"),
+    ("Papaoutai", "Stromae"),
+    ("Blinding Lights", "The Weeknd"),
+    ("Alors on danse", "Stromae"),
+    ("Levitating", "Dua Lipa"),
+    ("Tous les mêmes", "Stromae"),
+    ("Get Lucky", "Daft Punk"),
+]
+
+
+def normalize(text):
+    """Minuscules, ponctuation retirée, espaces normalisés (pour comparer textes et requêtes)."""
+    return " ".join(re.sub(r"[^\w]+", " ", text.lower()).split())
+
+
+def text_similarity(extracted, expected):
+    """Similarité (0-1) entre le texte extrait et le texte attendu, après normalisation."""
+    return difflib.SequenceMatcher(None, normalize(extracted), normalize(expected)).ratio()
+
+
+def load_corpus(path=DEFAULT_CORPUS):
+    """Charge le corpus étiqueté ; les chemins d'images sont résolus par rapport au fichier du corpus."""
+    with open(path, encoding="utf-8") as f:
+        items = json.load(f)
+    base = os.path.dirname(os.path.abspath(path))
+    for item in items:
+        item["image"] = os.path.join(base, item["image"])
+    return items
+
+
+def _font(size):
+    try:
+        return ImageFont.truetype("DejaVuSans.ttf", size)
+    except OSError:
+        return ImageFont.load_default(size=size)
+
+
+def render_synthetic(folder):
+    """
+    Rend une frame synthétique par résolution de DEVICE_RESOLUTIONS : fond blanc,
+    titre et artiste dessinés en noir dans la zone de crop du profil 'portrait'/'Photo'.
+
+    Returns:
+        list: Entrées de corpus {"image", "title", "artist", "url"} pour les fichiers générés.
+    """
+    items = []
+    seen = set()
+    for model, (w, h) in DEVICE_RESOLUTIONS.items():
+        if (w, h) in seen:
+            continue
+        seen.add((w, h))
+        title, artist = SYNTHETIC_SONGS[len(items) % len(SYNTHETIC_SONGS)]
+        img = Image.new("RGB", (w, h), "white")
+        left, top, right, bottom = get_crop_box(img, model, device_type={"device": model, "orientation": "portrait", "source": "Photo"})
+        draw = ImageDraw.Draw(img)
+        size = max(12, (bottom - top) // 5)
+        draw.text((left + size, top + size // 2), title, fill="black", font=_font(size))
+        draw.text((left + size, top + size * 2), artist, fill="black", font=_font(int(size * 0.8)))
+        path = os.path.join(folder, f"synthetic_{model.replace(' ', '_')}.png")
+        img.save(path)
+        items.append({"image": path, "title": title, "artist": artist, "url": f"stub://{normalize(artist + ' ' + title).replace(' ', '-')}"})
+    return items
+
+
+def make_stub_search(catalog):
+    """
+    Crée une fonction de recherche simulée (même signature que search_youtube_api) sur un catalogue local :
+    retourne l'entrée dont le plus de mots (titre + artiste) apparaissent dans la requête.
+    """
+    backend = LocalCatalogBackend(catalog, platform="Stub", min_score=STUB_MIN_SCORE)
+
+    def stub_search(query, api_key=None, max_results=5):
+        return backend.search(query, max_results=max_results)
+
+    return stub_search
+
+
+def run_harness(items):
+    """
+    Exécute la pipeline complète sur chaque entrée, recherche simulée.
+
+    Returns:
+        dict: {"summary": {...}, "items": [...]} avec précision, appels Tesseract et temps.
+    """
+    # Imports différés : la pile OCR n'est chargée que pour l'exécution
+    import main
+    from ocr_engine import clear_caches, tesseract_call_count
+
+    stub_search = make_stub_search(items)
+    clear_caches()
+    rows = []
+    for item in items:
+        calls_before = tesseract_call_count()
+        start = time.perf_counter()
+        ocr_rows = main.extract_file_text(item["image"])
+        results = [main.search_text(r, api_key=None, search_fn=stub_search) for r in ocr_rows]
+        elapsed = time.perf_counter() - start
+        extracted = " ".join(r["extracted_text"] for r in results)
+        urls = [r["youtube_url"] for r in results]
+        expected_text = f"{item['title']} {item['artist']}".strip()
+        similarity = text_similarity(extracted, expected_text)
+        rows.append({
+            "image": os.path.basename(item["image"]),
+            "extracted_text": extracted,
+            "text_similarity": round(similarity, 3),
+            "text_ok": similarity >= TEXT_MATCH_RATIO,
+            "url_ok": item["url"] in urls,
+            "tesseract_calls": tesseract_call_count() - calls_before,
+            "seconds": round(elapsed, 3),
+        })
+    n = len(rows) or 1
+    summary = {
+        "items": len(rows),
+        "url_accuracy": sum(r["url_ok"] for r in rows) / n,
+        "text_accuracy": sum(r["text_ok"] for r in rows) / n,
+        "tesseract_calls_per_image": sum(r["tesseract_calls"] for r in rows) / n,
+        "seconds_per_image": sum(r["seconds"] for r in rows) / n,
+    }
+    return {"summary": summary, "items": rows}
+
+
+def compare_to_baseline(report, baseline, max_drop=DEFAULT_MAX_DROP):
+    """
+    Compare un rapport à un rapport de référence.
+
+    Returns:
+        list: Messages d'erreur (vide si aucune régression de précision au-delà de max_drop).
+    """
+    errors = []
+    for metric in ("url_accuracy", "text_accuracy"):
+        now, ref = report["summary"][metric], baseline["summary"][metric]
+        if now < ref - max_drop:
+            errors.append(f"{metric} : {now:.3f} < référence {ref:.3f} - {max_drop}")
+    return errors
+
+
+def print_report(report, baseline=None):
+    """Affiche le détail par image puis le résumé, avec la référence à côté si fournie."""
+    for r in report["items"]:
+        print(f"{r['image']:<40} texte={'OK' if r['text_ok'] else '--'} ({r['text_similarity']:.2f}) "
+              f"video={'OK' if r['url_ok'] else '--'} tesseract={r['tesseract_calls']} t={r['seconds']:.2f}s")
+    print()
+    for key, value in report["summary"].items():
+        ref = f"   (référence : {baseline['summary'][key]:.3f})" if baseline else ""
+        print(f"{key:<28} {value:.3f}{ref}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Banc de non-régression précision + débit.")
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="corpus étiqueté (JSON)")
+    parser.add_argument("--no-synthetic", action="store_true", help="ne pas ajouter les frames synthétiques")
+    parser.add_argument("--report", help="écrit le rapport JSON à ce chemin")
+    parser.add_argument("--baseline", help="rapport JSON de référence à comparer")
+    parser.add_argument("--max-drop", type=float, default=DEFAULT_MAX_DROP, help="baisse de précision tolérée")
+    args = parser.parse_args(argv)
+
+    items = load_corpus(args.corpus)
+    with tempfile.TemporaryDirectory() as tmp:
+        if not args.no_synthetic:
+            items += render_synthetic(tmp)
+        report = run_harness(items)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    if baseline:
+        errors = compare_to_baseline(report, baseline, args.max_drop)
+        for e in errors:
+            print(f"RÉGRESSION : {e}")
+        if errors:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+"""
+Module run_history.py
+Historique des exécutions de la pipeline, en ajout seul, dans une base SQLite indexée.
+
+main_pipeline.log est du texte libre (les textes OCR multi-lignes cassent toute lecture ligne à ligne)
+et main_pipeline_results.csv est écrasé à chaque exécution. Chaque exécution ajoute ici une ligne
+dans 'runs' et une ligne par image (ou panneau / morceau de vidéo) dans 'results' : device, orientation,
+source, zone de crop retenue, stratégie et confiance de la cascade, texte OCR, requête, résultat,
+durées de détection / OCR / recherche, et les versions dont le résultat dépend (empreinte de l'image,
+version du profil de crop, version de la liste noire ; voir eval_cache).
+Aucune ligne n'est jamais modifiée ni supprimée.
+Les agrégats (taux de réussite par device ou par source, sur tout l'historique ou une seule exécution ;
+morceaux les plus trouvés) s'appuient sur des index couvrants : ils ne lisent que l'index, sans
+reparcourir les textes OCR.
+"""
+
+import datetime
+import sqlite3
+
+# Base d'historique par défaut (à côté des CSV et logs de la pipeline)
+DEFAULT_DB = "run_history.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    started_at TEXT NOT NULL,
+    command TEXT NOT NULL,
+    images INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs(run_id),
+    image TEXT NOT NULL,
+    device_type TEXT,
+    device TEXT,
+    orientation TEXT,
+    source TEXT,
+    crop_left INTEGER,
+    crop_top INTEGER,
+    crop_right INTEGER,
+    crop_bottom INTEGER,
+    strategy TEXT,
+    confidence REAL,
+    extracted_text TEXT,
+    query TEXT,
+    youtube_title TEXT,
+    youtube_url TEXT,
+    hit INTEGER NOT NULL,
+    detect_seconds REAL,
+    ocr_seconds REAL,
+    search_seconds REAL,
+    digest TEXT,
+    crop_version TEXT,
+    filter_version TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_results_device ON results(device, hit, ocr_seconds);
+CREATE INDEX IF NOT EXISTS idx_results_source ON results(source, hit, ocr_seconds);
+CREATE INDEX IF NOT EXISTS idx_results_run_device ON results(run_id, device, hit, ocr_seconds);
+CREATE INDEX IF NOT EXISTS idx_results_run_source ON results(run_id, source, hit, ocr_seconds);
+CREATE INDEX IF NOT EXISTS idx_results_song ON results(youtube_url, youtube_title) WHERE hit = 1;
+"""
+
+# Colonnes de 'results' remplies à partir des lignes de la pipeline (hors identifiants et zone de crop)
+ROW_COLUMNS = [
+    "image", "device_type", "device", "orientation", "source", "strategy", "confidence",
+    "extracted_text", "query", "youtube_title", "youtube_url", "detect_seconds", "ocr_seconds", "search_seconds",
+    "digest", "crop_version", "filter_version",
+]
+
+# Regroupements autorisés pour hit_rate (noms de colonnes indexées)
+GROUP_COLUMNS = ("device", "source")
+
+
+def connect(db_path=DEFAULT_DB):
+    """Ouvre (et crée si besoin) la base d'historique ; mode WAL pour lire pendant une écriture."""
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _values(run_id, row):
+    box = row.get("crop_box") or (None, None, None, None)
+    values = [row.get(c) for c in ROW_COLUMNS]
+    return [run_id, *values, *box, 1 if row.get("youtube_title") else 0]
+
+
+def record_run(rows, command="pipeline", db_path=DEFAULT_DB):
+    """
+    Ajoute une exécution et toutes ses lignes, en une seule transaction.
+
+    Args:
+        rows (list): Lignes de la pipeline (image, device_type, extracted_text, youtube_*, détails OCR...).
+            Les colonnes absentes (ex: étape 'search' lancée depuis un CSV) sont enregistrées à NULL.
+        command (str): Étape ou commande à l'origine de l'exécution.
+        db_path (str): Chemin de la base.
+
+    Returns:
+        int: Identifiant de l'exécution (run_id).
+    """
+    started_at = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    columns = ["run_id", *ROW_COLUMNS, "crop_left", "crop_top", "crop_right", "crop_bottom", "hit"]
+    insert = f"INSERT INTO results ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+    conn = connect(db_path)
+    try:
+        with conn:
+            run_id = conn.execute(
+                "INSERT INTO runs (started_at, command, images) VALUES (?, ?, ?)", (started_at, command, len(rows))
+            ).lastrowid
+            conn.executemany(insert, (_values(run_id, row) for row in rows))
+    finally:
+        conn.close()
+    return run_id
+
+
+def _query(sql, params=(), db_path=DEFAULT_DB):
+    conn = connect(db_path)
+    try:
+        return [dict(r) for r in conn.execute(sql, params)]
+    finally:
+        conn.close()
+
+
+def hit_rate(by="device", run_id=None, db_path=DEFAULT_DB):
+    """
+    Taux de réussite (résultat trouvé) et durée OCR moyenne, par device ou par source.
+
+    Args:
+        by (str): 'device' ou 'source'.
+        run_id (int, optionnel): Limite à une exécution ; par défaut tout l'historique.
+
+    Returns:
+        list: {by, "images", "hits", "hit_rate", "avg_ocr_seconds"} par taux de réussite décroissant.
+    """
+    if by not in GROUP_COLUMNS:
+        raise ValueError(f"regroupement inconnu : {by!r} (attendu : {', '.join(GROUP_COLUMNS)})")
+    where, params = ("WHERE run_id = ?", (run_id,)) if run_id is not None else ("", ())
+    return _query(
+        f"SELECT {by}, COUNT(*) AS images, SUM(hit) AS hits, AVG(hit) AS hit_rate, AVG(ocr_seconds) AS avg_ocr_seconds "
+        f"FROM results {where} GROUP BY {by} ORDER BY hit_rate DESC, images DESC",
+        params, db_path,
+    )
+
+
+def top_songs(limit=10, db_path=DEFAULT_DB):
+    """
+    Morceaux les plus souvent trouvés sur tout l'historique.
+
+    Returns:
+        list: {"youtube_title", "youtube_url", "count"} par nombre d'occurrences décroissant.
+    """
+    return _query(
+        "SELECT youtube_title, youtube_url, COUNT(*) AS count FROM results WHERE hit = 1 "
+        "GROUP BY youtube_url ORDER BY count DESC LIMIT ?",
+        (limit,), db_path,
+    )
+
+
+def list_runs(limit=10, db_path=DEFAULT_DB):
+    """
+    Dernières exécutions avec leur taux de réussite.
+
+    Returns:
+        list: {"run_id", "started_at", "command", "images", "hits"} de la plus récente à la plus ancienne.
+    """
+    return _query(
+        "SELECT runs.run_id, started_at, command, images, "
+        "(SELECT COALESCE(SUM(hit), 0) FROM results WHERE results.run_id = runs.run_id) AS hits "
+        "FROM runs ORDER BY runs.run_id DESC LIMIT ?",
+        (limit,), db_path,
+    )
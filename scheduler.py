@@ -0,0 +1,67 @@
+"""
+Module scheduler.py
+Ordonnancement par priorité des fichiers à traiter : les images peu coûteuses et à fort rendement d'abord.
+
+Le coût de chaque fichier est estimé sans décoder l'image (taille du fichier, dimensions et métadonnées
+lues par metadata_probe) ; le rendement attendu dépend de la probabilité que l'image donne un résultat
+(device supporté, choisi comme analyze_image : tag Model puis résolution ; pas une photo d'appareil photo).
+La source (YouTube, Shazam...) n'est connue qu'après l'OCR : elle n'entre pas dans l'estimation.
+Les fichiers sont triés par coût / rendement croissant : un petit crop de notification Shazam passe
+avant un PNG iPad YouTube de 2 Mo qui demande plusieurs passes OCR. L'ordre canonique des résultats
+(CSV final) est rétabli à la fin par l'appelant.
+"""
+
+import os
+
+from detect_source_type import device_from_metadata
+from device_image_types import DEVICE_IMAGE_TYPES
+from metadata_probe import probe_metadata
+
+# Poids du nombre de mégapixels et de la taille du fichier (Mo) dans le coût estimé
+PIXEL_WEIGHT = 1.0
+SIZE_WEIGHT = 0.5
+# Multiplicateur de coût des vidéos (plusieurs frames décodées et OCR à chaque changement)
+VIDEO_COST_FACTOR = 20.0
+# Rendement attendu (probabilité d'obtenir un résultat) selon le cas
+YIELD_SUPPORTED = 1.0
+YIELD_UNKNOWN_DEVICE = 0.05
+YIELD_CAMERA_PHOTO = 0.01
+
+_SUPPORTED = {(d["device"], d["orientation"]) for d in DEVICE_IMAGE_TYPES}
+
+
+def estimate(path, video_extensions=('.mp4', '.mov', '.m4v')):
+    """
+    Estime le coût et le rendement attendu du traitement d'un fichier (en-tête seulement).
+
+    Returns:
+        dict: {"path", "cost", "yield", "priority"} ; priorité faible = traité en premier.
+    """
+    size_mb = os.path.getsize(path) / (1024 * 1024)
+    if path.lower().endswith(video_extensions):
+        cost = VIDEO_COST_FACTOR * (1.0 + SIZE_WEIGHT * size_mb)
+        expected_yield = YIELD_SUPPORTED
+    else:
+        meta = probe_metadata(path)
+        width, height = meta["width"] or 0, meta["height"] or 0
+        megapixels = width * height / 1e6
+        cost = PIXEL_WEIGHT * megapixels + SIZE_WEIGHT * size_mb
+        if meta["kind"] == "photo":
+            expected_yield = YIELD_CAMERA_PHOTO
+        else:
+            device, orientation = device_from_metadata(meta, width, height) if width and height else ("unknown", "")
+            # Un panneau Split View est traité avec le profil de l'orientation de l'écran complet
+            supported = (device, orientation.replace("_split", "")) in _SUPPORTED
+            expected_yield = YIELD_SUPPORTED if supported else YIELD_UNKNOWN_DEVICE
+    return {"path": path, "cost": cost, "yield": expected_yield, "priority": cost / expected_yield}
+
+
+def schedule(paths):
+    """
+    Trie les fichiers par priorité (coût / rendement croissant), à égalité dans l'ordre des noms.
+
+    Returns:
+        list: Chemins dans l'ordre de traitement.
+    """
+    estimates = [estimate(p) for p in paths]
+    return [e["path"] for e in sorted(estimates, key=lambda e: (e["priority"], os.path.basename(e["path"])))]
@@ -0,0 +1,295 @@
+"""
+Module search_backends.py
+Backends de recherche interchangeables et recherche "hedgée" : le premier bon résultat gagne.
+
+Backends fournis (même interface : search(query, max_results) -> liste de résultats bruts) :
+- YouTubeApiBackend : YouTube Data API v3 (fetch_youtube_api, clé API et quota)
+- YoutubeSearchBackend : bibliothèque youtube-search-python (sans clé ni quota, import différé)
+- LocalCatalogBackend : catalogue local (JSON au format de golden_corpus.json), tests et hors-ligne
+- FunctionBackend : n'importe quelle fonction (query, api_key=..., max_results=...) (stubs de test)
+
+HedgedSearch interroge les backends en parallèle, chacun avec son délai maximal ; un backend secondaire
+peut démarrer avec un retard (delay) pour ménager le quota, mais il démarre aussitôt si un backend
+précédent échoue (quota dépassé, réseau). Le premier backend dont un résultat passe
+is_valid_music_result gagne ; les appels encore en cours sont abandonnés (leur réponse est ignorée).
+Chaque backend a son propre pool de threads borné : des appels bloqués (API qui ne répond plus) n'occupent
+que les threads de ce backend, et quand ils sont tous pris le backend est sauté au lieu d'attendre en file.
+Avec un cache (eval_cache.EvalCache), les réponses brutes des backends réseau sont enregistrées par
+backend et par requête : une requête déjà vue est refiltrée avec la liste noire courante, sans appel.
+Une instance de HedgedSearch s'utilise directement comme search_fn de search_stage.search_text.
+"""
+
+import json
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from music_search import fetch_youtube_api, filter_music_results
+
+# Délai maximal (secondes) d'une recherche par défaut, par backend
+DEFAULT_TIMEOUT = 5.0
+# Retard (secondes) du démarrage du backend secondaire par défaut (youtube-search-python)
+SCRAPER_DELAY = 0.5
+# Part minimale des mots d'une entrée du catalogue présents dans la requête pour la retourner
+CATALOG_MIN_SCORE = 0.5
+# Nombre de threads par backend : un backend bloqué (API qui ne répond plus) n'occupe que les siens
+MAX_THREADS = 16
+
+# Par nom de backend : (pool de threads, places libres) ; créés à la demande dans chaque processus
+# (une HedgedSearch peut être envoyée à un worker)
+_executors = {}
+_executor_lock = threading.Lock()
+
+# Compteurs par backend : {nom: {"calls", "wins", "errors", "timeouts", "saturated"}}
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def _get_executor(name):
+    with _executor_lock:
+        if name not in _executors:
+            _executors[name] = (
+                ThreadPoolExecutor(max_workers=MAX_THREADS, thread_name_prefix=f"search-{name}"),
+                threading.BoundedSemaphore(MAX_THREADS),
+            )
+        return _executors[name]
+
+
+def _count(name, field):
+    with _stats_lock:
+        entry = _stats.setdefault(name, {"calls": 0, "wins": 0, "errors": 0, "timeouts": 0, "saturated": 0})
+        entry[field] += 1
+
+
+def backend_stats():
+    """
+    Retourne une copie des compteurs par backend : appels, victoires, erreurs, délais dépassés,
+    et appels sautés parce que tous les threads du backend sont encore pris par des appels bloqués.
+    """
+    with _stats_lock:
+        return {name: dict(entry) for name, entry in _stats.items()}
+
+
+class SearchBackend:
+    """
+    Interface d'un backend de recherche.
+
+    Args:
+        name (str): Nom du backend (statistiques, logs).
+        timeout (float): Délai maximal de réponse ; au-delà le backend est ignoré pour cette requête.
+        delay (float): Retard de démarrage dans une recherche hedgée (0 = immédiat).
+    """
+
+    # Réponses brutes gardées dans le cache de HedgedSearch (backends réseau uniquement)
+    cacheable = False
+
+    def __init__(self, name, timeout=DEFAULT_TIMEOUT, delay=0.0):
+        self.name = name
+        self.timeout = timeout
+        self.delay = delay
+
+    def search(self, query, max_results=5):
+        """Retourne une liste de {"platform", "title", "url"} (+ "description" optionnelle), non filtrée."""
+        raise NotImplementedError
+
+
+class YouTubeApiBackend(SearchBackend):
+    """YouTube Data API v3 (catégorie Musique)."""
+
+    cacheable = True
+
+    def __init__(self, api_key, timeout=DEFAULT_TIMEOUT, delay=0.0):
+        super().__init__("youtube_api", timeout, delay)
+        self.api_key = api_key
+
+    def search(self, query, max_results=5):
+        return fetch_youtube_api(query, api_key=self.api_key, max_results=max_results)
+
+
+class YoutubeSearchBackend(SearchBackend):
+    """Bibliothèque youtube-search-python : recherche YouTube sans clé API ni quota."""
+
+    cacheable = True
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, delay=SCRAPER_DELAY):
+        super().__init__("youtube_search", timeout, delay)
+
+    def search(self, query, max_results=5):
+        # Import différé : dépendance optionnelle, inutile si ce backend n'est pas utilisé
+        from youtubesearchpython import VideosSearch
+        items = VideosSearch(query, limit=max_results).result().get("result", [])
+        return [
+            {
+                "platform": "YouTube",
+                "title": item["title"],
+                "url": item["link"],
+                "description": " ".join(s["text"] for s in item.get("descriptionSnippet") or []),
+            }
+            for item in items
+        ]
+
+
+class LocalCatalogBackend(SearchBackend):
+    """
+    Catalogue local [{"title", "artist", "url"}] : retourne les entrées dont le plus de mots
+    (titre + artiste) apparaissent dans la requête.
+    """
+
+    def __init__(self, catalog, platform="Local", min_score=CATALOG_MIN_SCORE, timeout=DEFAULT_TIMEOUT, delay=0.0):
+        super().__init__("catalog", timeout, delay)
+        self.platform = platform
+        self.min_score = min_score
+        self.entries = [(set(_words(f"{c['title']} {c['artist']}")), c) for c in catalog]
+
+    def search(self, query, max_results=5):
+        words = set(_words(query))
+        scored = sorted(((len(ref & words) / len(ref), c) for ref, c in self.entries if ref), key=lambda x: x[0], reverse=True)
+        return [
+            {"platform": self.platform, "title": f"{c['artist']} - {c['title']}", "url": c["url"]}
+            for score, c in scored[:max_results] if score >= self.min_score
+        ]
+
+
+class FunctionBackend(SearchBackend):
+    """Adapte une fonction (query, api_key=..., max_results=...) -> résultats (stubs, fakes de test)."""
+
+    def __init__(self, name, search_fn, api_key=None, timeout=DEFAULT_TIMEOUT, delay=0.0):
+        super().__init__(name, timeout, delay)
+        self.search_fn = search_fn
+        self.api_key = api_key
+
+    def search(self, query, max_results=5):
+        return self.search_fn(query, api_key=self.api_key, max_results=max_results)
+
+
+def _words(text):
+    # Minuscules, ponctuation retirée (même normalisation que regression_harness.normalize)
+    return re.sub(r"[^\w]+", " ", text.lower()).split()
+
+
+def load_catalog(path):
+    """Charge un catalogue JSON [{"title", "artist", "url", ...}] (ex: golden_corpus.json)."""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class HedgedSearch:
+    """
+    Recherche sur plusieurs backends en parallèle ; le premier résultat valide gagne.
+    S'utilise comme search_fn : HedgedSearch(backends)(query, api_key=None, max_results=5).
+
+    Args:
+        backends (list): SearchBackend par ordre de préférence.
+        cache (EvalCache, optionnel): Cache des réponses brutes des backends réseau (cacheable).
+    """
+
+    def __init__(self, backends, cache=None):
+        self.backends = list(backends)
+        self.cache = cache
+
+    def _cached(self, backend, query, max_results):
+        if self.cache is None or not backend.cacheable:
+            return None
+        return self.cache.get_raw(backend.name, query, max_results)
+
+    def _fetch(self, backend, query, max_results, slots):
+        # Exécuté dans un thread du backend : la réponse brute est enregistrée avant tout filtrage.
+        # La place n'est rendue qu'à la fin réelle de l'appel, même abandonné pour délai dépassé
+        try:
+            raw = backend.search(query, max_results)
+            if self.cache is not None and backend.cacheable:
+                self.cache.put_raw(backend.name, query, max_results, raw)
+            return raw
+        finally:
+            slots.release()
+
+    def __call__(self, query, api_key=None, max_results=5):
+        """
+        Returns:
+            list: Résultats valides du backend gagnant ({"platform", "title", "url"}),
+                  liste vide si aucun backend ne donne de résultat valide dans son délai.
+        """
+        waiting = []
+        for backend in self.backends:
+            raw = self._cached(backend, query, max_results)
+            if raw is None:
+                waiting.append(backend)
+                continue
+            # Réponse déjà reçue : refiltrée avec la liste noire courante, le backend n'est pas rappelé
+            results = filter_music_results(raw)
+            if results:
+                print(f"→ Réponse brute {backend.name} réutilisée (aucun appel), refiltrée avec la liste noire courante.")
+                return results
+        start = time.monotonic()
+        running = {}
+
+        def launch(backend):
+            waiting.remove(backend)
+            executor, slots = _get_executor(backend.name)
+            if not slots.acquire(blocking=False):
+                # Tous ses threads sont pris par des appels bloqués : l'appel resterait en file et
+                # dépasserait son délai sans jamais partir ; il est sauté comme un échec
+                _count(backend.name, "saturated")
+                return
+            _count(backend.name, "calls")
+            future = executor.submit(self._fetch, backend, query, max_results, slots)
+            running[future] = (backend, time.monotonic() + backend.timeout)
+
+        while waiting or running:
+            # Démarre les backends dont le retard est écoulé
+            for backend in [b for b in waiting if b.delay <= time.monotonic() - start]:
+                launch(backend)
+            if waiting and not running:
+                # Plus rien en cours (échec ou délai dépassé des précédents) : le suivant démarre sans attendre
+                launch(waiting[0])
+            now_abs = time.monotonic()
+            # Abandonne les backends dont le délai est dépassé
+            for future, (backend, deadline) in list(running.items()):
+                if deadline <= now_abs:
+                    _count(backend.name, "timeouts")
+                    del running[future]
+            if not running:
+                continue
+            next_event = min(deadline for _, deadline in running.values())
+            if waiting:
+                next_event = min(next_event, start + min(b.delay for b in waiting))
+            done, _ = wait(list(running), timeout=max(0.0, next_event - now_abs), return_when=FIRST_COMPLETED)
+            for future in done:
+                backend, _ = running.pop(future)
+                try:
+                    results = filter_music_results(future.result())
+                except Exception as e:
+                    _count(backend.name, "errors")
+                    print(f"→ Recherche {backend.name} en échec : {type(e).__name__}: {e}")
+                    continue
+                if results:
+                    _count(backend.name, "wins")
+                    return results
+        return []
+
+
+def build_backends(spec, api_key=None):
+    """
+    Construit la liste des backends à partir d'une spécification texte (option --backends du CLI).
+
+    Args:
+        spec (str): Noms séparés par des virgules : 'api', 'scraper', 'catalog=chemin.json'.
+        api_key (str, optionnel): Clé API YouTube (requise par 'api').
+
+    Returns:
+        list: SearchBackend dans l'ordre de la spécification.
+    """
+    backends = []
+    for item in filter(None, (s.strip() for s in spec.split(","))):
+        name, _, arg = item.partition("=")
+        if name == "api":
+            backends.append(YouTubeApiBackend(api_key))
+        elif name == "scraper":
+            # Backend secondaire : démarre en retard seulement s'il n'est pas le premier de la liste
+            backends.append(YoutubeSearchBackend(delay=SCRAPER_DELAY if backends else 0.0))
+        elif name == "catalog" and arg:
+            backends.append(LocalCatalogBackend(load_catalog(arg)))
+        else:
+            raise ValueError(f"backend de recherche inconnu : {item!r} (api, scraper, catalog=FICHIER)")
+    return backends
@@ -0,0 +1,145 @@
+"""
+Module search_stage.py
+Étape 'search' de la pipeline : recherche musicale des textes OCR, logs et CSV de résultats.
+
+Aucun import de la pile OCR (pytesseract, NumPy, Pillow) : la sous-commande 'search' du CLI, qui part
+d'un CSV produit par l'étape 'ocr', démarre sans charger les modèles ni les bibliothèques d'image.
+main.py réexporte ces fonctions pour les étapes 'ocr' et 'pipeline'.
+"""
+
+import csv
+import datetime
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
+
+from eval_cache import EvalCache, RawCachedSearch, DEFAULT_DB as EVAL_CACHE_DB
+from music_search import search_youtube_api, filter_version
+from run_history import record_run, DEFAULT_DB as HISTORY_DB
+
+# Colonnes du CSV de la sortie OCR (étape 'ocr') et du CSV final (étapes 'search' et 'pipeline')
+OCR_FIELDS = ["image", "device_type", "extracted_text"]
+RESULT_FIELDS = ["image", "device_type", "extracted_text", "youtube_title", "youtube_url"]
+# Détail OCR ajouté au CSV de l'étape 'ocr', relu par l'étape 'search' pour l'historique des exécutions
+CROP_FIELDS = ["crop_left", "crop_top", "crop_right", "crop_bottom"]
+OCR_DETAIL_FIELDS = [
+    "device", "orientation", "source", *CROP_FIELDS, "strategy", "confidence",
+    "detect_seconds", "ocr_seconds", "digest", "crop_version",
+]
+# Colonnes numériques du détail OCR (relues depuis le texte du CSV)
+_FLOAT_FIELDS = ("confidence", "detect_seconds", "ocr_seconds")
+
+
+def log_full(info, log_path="main_pipeline.log"):
+    """
+    Ajoute une ligne détaillée dans le fichier log principal pour chaque image traitée.
+
+    Args:
+        info (dict): Dictionnaire contenant les infos à logger (image, device_type, texte, youtube).
+        log_path (str): Chemin du fichier log (par défaut 'main_pipeline.log').
+    """
+    with open(log_path, "a", encoding="utf-8") as f:
+        # Récupère la date et l'heure courante pour le log
+        now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        # Écrit une ligne formatée avec toutes les infos importantes
+        f.write(f"[{now}] IMAGE: {info['image']} | TYPE: {info['device_type']} | TEXTE: {info['extracted_text']} | YOUTUBE: {info['youtube_url']}\n")
+
+
+def search_text(row, api_key, search_fn=None):
+    """
+    Étape 3 pour une ligne OCR : recherche musicale YouTube (requête enrichie).
+
+    Args:
+        row (dict): Ligne {"image", "device_type", "extracted_text"}.
+        api_key (str): Clé API YouTube.
+        search_fn (callable, optionnel): Fonction (query, api_key=...) -> résultats ;
+            par défaut search_youtube_api (remplaçable par un stub pour les tests/benchmarks).
+
+    Returns:
+        dict: La ligne complétée par youtube_title / youtube_url ('AUCUN RESULTAT' si rien trouvé),
+              la requête envoyée (query), la version de la liste noire (filter_version)
+              et la durée de la recherche (search_seconds).
+    """
+    row = dict(row, youtube_title="", youtube_url="AUCUN RESULTAT", query="", search_seconds=0.0,
+               filter_version=filter_version())
+    extracted_text = row["extracted_text"]
+    if not extracted_text.strip():
+        print("→ Aucun texte extrait, passage au suivant.")
+        row["extracted_text"] = ""
+        return row
+    query = f"{extracted_text} music hq"
+    start = time.perf_counter()
+    music_results = (search_fn or search_youtube_api)(query, api_key=api_key)
+    row["query"] = query
+    row["search_seconds"] = time.perf_counter() - start
+    if not music_results:
+        print("→ Aucun résultat musical trouvé.")
+        return row
+    # Prend le meilleur résultat YouTube
+    best = music_results[0]
+    print(f"Meilleur résultat YouTube : {best['title']} → {best['url']}")
+    row["youtube_title"] = best["title"]
+    row["youtube_url"] = best["url"]
+    return row
+
+
+def write_csv(rows, output_csv, fieldnames):
+    """Écrit les lignes dans un fichier CSV (écrasé)."""
+    with open(output_csv, "w", newline='', encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def write_ocr_csv(rows, output_csv):
+    """Écrit le CSV de l'étape 'ocr' : texte extrait et détail OCR (zone de crop sur quatre colonnes)."""
+    flat = [dict(row, **dict(zip(CROP_FIELDS, row.get("crop_box") or ()))) for row in rows]
+    write_csv(flat, output_csv, OCR_FIELDS + OCR_DETAIL_FIELDS)
+
+
+def read_ocr_csv(input_csv):
+    """
+    Relit un CSV de l'étape 'ocr' en rétablissant le détail OCR (types numériques, zone de crop).
+    Un CSV sans les colonnes de détail (ancien format) donne des lignes sans ce détail.
+
+    Returns:
+        list: Lignes {"image", "device_type", "extracted_text", ...détail OCR, "crop_box"}.
+    """
+    with open(input_csv, newline='', encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    for row in rows:
+        for field in OCR_DETAIL_FIELDS:
+            if row.get(field) == "":
+                row[field] = None
+        for field in _FLOAT_FIELDS:
+            if row.get(field) is not None:
+                row[field] = float(row[field])
+        box = [row.pop(field, None) for field in CROP_FIELDS]
+        if None not in box:
+            row["crop_box"] = tuple(int(v) for v in box)
+    return rows
+
+
+def run_search_stage(input_csv, output_csv="main_pipeline_results.csv", api_key=None, workers=1, search_fn=None,
+                     history_db=HISTORY_DB, cache_db=EVAL_CACHE_DB):
+    """
+    Étape 'search' seule : lit un CSV produit par l'étape 'ocr' et recherche chaque texte sur YouTube.
+    Seules les lignes avec un résultat sont écrites dans le CSV de sortie ; toutes sont loguées
+    et ajoutées à l'historique `history_db` (None pour ne rien enregistrer), avec le détail OCR
+    (device, source, zone de crop, stratégie...) relu depuis le CSV.
+    `search_fn` remplace search_youtube_api (ex: search_backends.HedgedSearch) ; sinon, avec `cache_db`,
+    les réponses brutes de l'API sont gardées et seulement refiltrées pour une requête déjà vue.
+    """
+    if search_fn is None and cache_db:
+        search_fn = RawCachedSearch(EvalCache(cache_db))
+    rows = read_ocr_csv(input_csv)
+    # Recherches réseau : un pool de threads suffit
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        rows = list(pool.map(search_text, rows, repeat(api_key), repeat(search_fn)))
+    for row in rows:
+        log_full(row)
+    if history_db:
+        record_run(rows, command="search", db_path=history_db)
+    results = [r for r in rows if r["youtube_title"]]
+    write_csv(results, output_csv, RESULT_FIELDS)
+    return results
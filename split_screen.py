@@ -0,0 +1,154 @@
+"""
+Module split_screen.py
+Détection du Split View iPad et découpage d'un screenshot en deux panneaux indépendants.
+
+Le séparateur du Split View est une bande noire verticale (ou horizontale) traversant tout l'écran,
+avec une petite poignée claire au milieu. On cherche cette signature sur l'image en niveaux de gris,
+puis on renvoie les deux panneaux sous forme de vues NumPy (sans copie) : chacun est ensuite
+traité comme une image à part entière, avec son propre profil de crop (orientation du panneau).
+"""
+
+import numpy as np
+
+# Plage (en fraction de la largeur/hauteur) où le séparateur peut se trouver (50/50, 1/3-2/3, 2/3-1/3)
+DIVIDER_RANGE = (0.25, 0.75)
+# Zone verticale (fraction de la longueur du séparateur) où se trouve la poignée
+HANDLE_ZONE = (0.40, 0.60)
+# Seuils de luminosité (0-255) : séparateur noir, poignée claire
+DIVIDER_MAX_LEVEL = 40
+HANDLE_MIN_LEVEL = 120
+# Épaisseur minimale du séparateur en pixels, et maximale en fraction de la largeur
+DIVIDER_MIN_WIDTH = 6
+DIVIDER_MAX_WIDTH = 0.04
+# Hauteur (fraction) de la bande haute décodée pour le pré-test des formats sans aperçu draft (PNG) :
+# le séparateur vertical la traverse au-dessus de la poignée
+PRECHECK_BAND = 0.25
+# Noms des panneaux selon l'axe du séparateur
+PANE_NAMES = {"vertical": ("left", "right"), "horizontal": ("top", "bottom")}
+
+
+def _dark_runs(dark, min_width, max_width):
+    # Bandes de colonnes sombres contiguës d'épaisseur plausible : (début, fin) relatifs à `dark`
+    x = 0
+    while x < len(dark):
+        if not dark[x]:
+            x += 1
+            continue
+        start = x
+        while x < len(dark) and dark[x]:
+            x += 1
+        if min_width <= x - start <= max_width:
+            yield start, x
+
+
+def has_dark_column(band, full_height, min_width=DIVIDER_MIN_WIDTH):
+    """
+    Pré-test peu coûteux sur la bande haute d'un screenshot : une bande de colonnes noires
+    la traverse-t-elle (sous la barre d'état), là où un séparateur vertical se trouverait ?
+
+    Args:
+        band (np.ndarray): Bande haute (h, W, 3) de l'image (h <= full_height).
+        full_height (int): Hauteur de l'image complète.
+
+    Returns:
+        bool: False si aucun séparateur vertical n'est possible.
+    """
+    # Sous la barre d'état et au-dessus de la poignée (la bande peut être l'image complète)
+    gray = band.max(axis=2)[int(0.05 * full_height):int(HANDLE_ZONE[0] * full_height)]
+    if not len(gray):
+        # Bande trop courte pour conclure : l'image sera testée en entier
+        return True
+    w = gray.shape[1]
+    lo, hi = int(DIVIDER_RANGE[0] * w), int(DIVIDER_RANGE[1] * w)
+    dark = gray[:, lo:hi].max(axis=0) < DIVIDER_MAX_LEVEL
+    max_width = max(min_width, int(DIVIDER_MAX_WIDTH * w))
+    return next(_dark_runs(dark, min_width, max_width), None) is not None
+
+
+def _find_vertical_divider(gray, min_width=DIVIDER_MIN_WIDTH):
+    """
+    Cherche un séparateur vertical dans une image en niveaux de gris (H, W).
+
+    Returns:
+        tuple ou None: (x_début, x_fin) de la bande séparatrice, ou None.
+    """
+    h, w = gray.shape
+    hz_top, hz_bottom = int(HANDLE_ZONE[0] * h), int(HANDLE_ZONE[1] * h)
+    # Hors de la zone de poignée (et hors barre d'état / barre d'accueil), le séparateur est noir
+    outside = np.concatenate([gray[int(0.05 * h):hz_top], gray[hz_bottom:int(0.95 * h)]])
+    lo, hi = int(DIVIDER_RANGE[0] * w), int(DIVIDER_RANGE[1] * w)
+    dark = outside[:, lo:hi].max(axis=0) < DIVIDER_MAX_LEVEL
+    max_width = max(min_width, int(DIVIDER_MAX_WIDTH * w))
+    # Parcourt les bandes de colonnes sombres contiguës
+    for start, end in _dark_runs(dark, min_width, max_width):
+        x0, x1 = lo + start, lo + end
+        # La poignée : quelques lignes claires au centre de la bande, dans la zone du milieu
+        center = gray[hz_top:hz_bottom, x0 + (x1 - x0) // 4:x1 - (x1 - x0) // 4]
+        bright_rows = int((center.max(axis=1) > HANDLE_MIN_LEVEL).sum())
+        if 0.005 * h <= bright_rows <= 0.1 * h:
+            return (x0, x1)
+    return None
+
+
+def find_divider(rgb, scale=1):
+    """
+    Détecte le séparateur du Split View.
+
+    Args:
+        rgb (np.ndarray): Screenshot complet (H, W, 3), ou aperçu réduit.
+        scale (float): Facteur de réduction de l'aperçu (l'épaisseur minimale du séparateur est ajustée).
+
+    Returns:
+        tuple ou None: (axe, début, fin) avec axe 'vertical' ou 'horizontal', ou None si pas de Split View.
+    """
+    # Luminance approchée, sans conversion PIL supplémentaire
+    gray = rgb.max(axis=2)
+    min_width = max(2, round(DIVIDER_MIN_WIDTH / scale))
+    band = _find_vertical_divider(gray, min_width)
+    if band:
+        return ("vertical",) + band
+    band = _find_vertical_divider(gray.T, min_width)
+    if band:
+        return ("horizontal",) + band
+    return None
+
+
+def split_panes(img):
+    """
+    Découpe un screenshot Split View en deux panneaux.
+
+    Args:
+        img (PIL.Image, FrameImage ou LazyImage): Screenshot complet.
+
+    Returns:
+        list: Liste de (nom_panneau, vue NumPy (H, W, 3)) ; liste vide si aucun séparateur n'est trouvé.
+    """
+    # LazyImage : pré-test avant tout décodage complet ; la plupart des screenshots iPad ne sont pas
+    # en Split View et n'ont alors jamais besoin d'être décodés en entier.
+    # JPEG : aperçu draft réduit (les deux axes) ; PNG : bande haute (séparateur vertical, seule
+    # disposition du Split View iPadOS), bande ensuite réutilisée par les crops du haut de l'écran
+    if hasattr(img, "preview"):
+        if img.format == "JPEG":
+            small, scale = img.preview()
+            if scale != 1 and find_divider(np.asarray(small.convert("RGB")), scale=scale) is None:
+                return []
+        else:
+            band = img.head(int(PRECHECK_BAND * img.size[1]))
+            if not has_dark_column(np.asarray(band.convert("RGB")), img.size[1]):
+                return []
+    # Décodé une seule fois ; les panneaux sont des vues sur ce même tableau
+    rgb = np.asarray(img.convert("RGB"))
+    divider = find_divider(rgb)
+    if divider is None:
+        return []
+    axis, start, end = divider
+    first, second = PANE_NAMES[axis]
+    if axis == "vertical":
+        return [(first, rgb[:, :start]), (second, rgb[:, end:])]
+    return [(first, rgb[:start]), (second, rgb[end:])]
+
+
+def pane_orientation(pane):
+    """Orientation propre d'un panneau (sert à choisir son profil de crop)."""
+    h, w = pane.shape[:2]
+    return "portrait" if h > w else "landscape"
@@ -0,0 +1,8 @@
+"""
+Configuration pytest : les modules de la pipeline sont à la racine du dépôt (pas de package).
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,149 @@
+"""
+Tests du service HTTP (PipelineService + make_server) avec un OCR simulé et la recherche simulée du banc
+de non-régression : réponse 200, regroupement des envois identiques, 503 + Retry-After quand la file est
+pleine, 415 et 413.
+"""
+
+import http.client
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import http_service
+from http_service import PipelineService, make_server
+from regression_harness import load_corpus, make_stub_search
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 64
+
+
+def _png(n):
+    # Envois distincts (empreintes différentes) au format PNG
+    return PNG + str(n).encode()
+
+
+class StubOcr:
+    """Remplace extract_file_text : texte fixe, appels comptés, blocage optionnel jusqu'à release()."""
+
+    def __init__(self, text="Wait\nMustafa Hussam", block=False):
+        self.text = text
+        self.calls = 0
+        self.gate = threading.Event()
+        if not block:
+            self.gate.set()
+
+    def __call__(self, path):
+        self.calls += 1
+        self.gate.wait(timeout=10)
+        return [{"image": os.path.basename(path), "device_type": "iPhone 16 Pro Max portrait Shazam",
+                 "extracted_text": self.text}]
+
+    def release(self):
+        self.gate.set()
+
+
+@pytest.fixture
+def start_service(monkeypatch, tmp_path):
+    # close() écrit crop_cascade.log dans le dossier courant
+    monkeypatch.chdir(tmp_path)
+    # Pool de threads à la place du pool OCR (processus) : le stub s'applique sans fork ni pickling
+    monkeypatch.setattr(http_service, "get_ocr_pool", lambda workers: ThreadPoolExecutor(max_workers=workers))
+    started = []
+
+    def start(ocr, **kwargs):
+        monkeypatch.setattr(http_service, "extract_file_text", ocr)
+        service = PipelineService(search_fn=make_stub_search(load_corpus()), **kwargs)
+        server = make_server(service, "127.0.0.1", 0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        started.append((server, service, ocr))
+        return service, server.server_port
+
+    yield start
+    for server, service, ocr in started:
+        ocr.release()
+        server.shutdown()
+        server.server_close()
+        service.close()
+
+
+def _post(port, body, name="shot.png"):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    try:
+        conn.request("POST", f"/search?name={name}", body=body)
+        response = conn.getresponse()
+        return response.status, dict(response.getheaders()), json.loads(response.read())
+    finally:
+        conn.close()
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "état attendu non atteint"
+        time.sleep(0.01)
+
+
+def test_search_returns_stub_result(start_service):
+    _, port = start_service(StubOcr())
+    status, _, payload = _post(port, _png(1))
+    assert status == 200
+    [row] = payload["results"]
+    assert row["image"] == "shot.png"
+    assert row["youtube_url"] == "stub://mustafa-hussam-wait"
+
+
+def test_identical_uploads_are_processed_once(start_service):
+    ocr = StubOcr(block=True)
+    service, port = start_service(ocr)
+    with ThreadPoolExecutor(max_workers=3) as clients:
+        responses = [clients.submit(_post, port, _png(1), f"copy{i}.png") for i in range(3)]
+        _wait_for(lambda: ocr.calls == 1)
+        ocr.release()
+        results = [r.result() for r in responses]
+    assert [status for status, _, _ in results] == [200, 200, 200]
+    assert [payload["results"][0]["image"] for _, _, payload in results] == ["copy0.png", "copy1.png", "copy2.png"]
+    # Un envoi identique après coup est servi depuis les résultats déjà calculés
+    assert _post(port, _png(1))[0] == 200
+    assert ocr.calls == 1
+    assert service.status()["cached_results"] == 1
+
+
+def test_full_queue_answers_503_with_retry_after(start_service):
+    ocr = StubOcr(block=True)
+    service, port = start_service(ocr, workers=1, batch_size=1, batch_wait=0.0, max_pending=1)
+    waiters = [service.submit(_png(1))]
+    # 1er envoi : en cours dans l'unique worker
+    _wait_for(lambda: service.status()["busy_batches"] == 1)
+    # 2e envoi : sorti de la file par le regroupement, qui attend un worker libre
+    waiters.append(service.submit(_png(2)))
+    _wait_for(lambda: service.status()["pending"] == 0)
+    # 3e envoi : occupe la seule place de la file
+    waiters.append(service.submit(_png(3)))
+    status, headers, payload = _post(port, _png(4))
+    assert status == 503
+    assert headers["Retry-After"] == "1"
+    assert "error" in payload
+    ocr.release()
+    assert all(w.result(timeout=10) for w in waiters)
+
+
+def test_unsupported_format_answers_415(start_service):
+    ocr = StubOcr()
+    _, port = start_service(ocr)
+    status, _, payload = _post(port, b"GIF89a" + b"\x00" * 32)
+    assert status == 415
+    assert "error" in payload
+    assert ocr.calls == 0
+
+
+def test_oversized_upload_answers_413(start_service, monkeypatch):
+    monkeypatch.setattr(http_service, "MAX_UPLOAD_BYTES", 32)
+    ocr = StubOcr()
+    _, port = start_service(ocr)
+    status, _, payload = _post(port, _png(1) + b"\x00" * 64)
+    assert status == 413
+    assert "error" in payload
+    assert ocr.calls == 0
@@ -0,0 +1,65 @@
+"""
+Tests du décodage partiel (lazy_image) : les crops de LazyImage doivent être identiques à ceux de
+l'image complète, sans décoder toute l'image. Détecte une mise à jour de Pillow qui retomberait
+silencieusement sur un décodage complet ou décoderait de mauvaises lignes.
+"""
+
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw
+
+from lazy_image import LazyImage
+from split_screen import split_panes
+
+WIDTH, HEIGHT = 640, 1200
+# Zones typiques de la cascade (bande titre en haut), puis une zone plus basse qui redécode plus de lignes
+BOXES = [(40, 60, 600, 140), (0, 20, 640, 300), (100, 500, 540, 700)]
+
+
+def _screenshot(path, **save_kwargs):
+    # Contenu différent sur chaque ligne : un décalage de lignes change les pixels du crop
+    rng = np.random.default_rng(0)
+    pixels = rng.integers(0, 256, size=(HEIGHT, WIDTH, 3), dtype=np.uint8)
+    pixels[:, :, 0] = (np.arange(HEIGHT) % 256)[:, None]
+    Image.fromarray(pixels).save(path, **save_kwargs)
+    return path
+
+
+@pytest.fixture(params=["png", "jpeg"])
+def screenshot(request, tmp_path):
+    if request.param == "png":
+        return _screenshot(tmp_path / "shot.png")
+    return _screenshot(tmp_path / "shot.jpg", quality=90, progressive=False)
+
+
+def test_crops_match_full_decode(screenshot):
+    lazy = LazyImage(str(screenshot))
+    with Image.open(screenshot) as full:
+        full.load()
+        for box in BOXES:
+            assert np.array_equal(np.asarray(lazy.crop(box)), np.asarray(full.crop(box))), box
+
+
+def test_only_rows_above_the_crop_are_decoded(screenshot):
+    lazy = LazyImage(str(screenshot))
+    lazy.crop(BOXES[0])
+    assert lazy.decoded_rows == BOXES[0][3]
+    lazy.crop(BOXES[2])
+    assert lazy.decoded_rows == BOXES[2][3]
+
+
+def test_png_without_divider_is_not_fully_decoded_by_split_check(tmp_path):
+    path = _screenshot(tmp_path / "ipad.png")
+    lazy = LazyImage(str(path))
+    assert split_panes(lazy) == []
+    assert lazy.decoded_rows < HEIGHT
+
+
+def test_png_split_view_is_still_detected(tmp_path):
+    im = Image.new("RGB", (2048, 1536), "white")
+    draw = ImageDraw.Draw(im)
+    draw.rectangle([1020, 0, 1031, 1535], fill="black")
+    draw.rectangle([1023, 700, 1028, 800], fill=(200, 200, 200))
+    im.save(tmp_path / "split.png")
+    panes = split_panes(LazyImage(str(tmp_path / "split.png")))
+    assert [(name, pane.shape[1]) for name, pane in panes] == [("left", 1020), ("right", 1016)]
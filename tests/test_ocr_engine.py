@@ -0,0 +1,64 @@
+"""
+Tests du choix de langue (ocr_engine.detect_lang) avec Tesseract simulé : seuil de caractères de l'OSD
+abaissé pour les crops titre/artiste, vote Unicode quand l'OSD échoue, pas d'OSD avec une seule langue.
+"""
+
+import pytest
+import pytesseract
+from PIL import Image
+
+import ocr_engine
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    # Chemin pytesseract (tesserocr absent), langues installées fixées, caches vides
+    monkeypatch.setattr(ocr_engine, "tesserocr", None)
+    monkeypatch.setattr(ocr_engine, "_installed_langs", {"eng", "fra", "ara", "rus", "osd"})
+    ocr_engine.clear_caches()
+    yield monkeypatch
+    ocr_engine.clear_caches()
+
+
+def _crop(shade=0):
+    return Image.new("L", (200, 40), shade)
+
+
+def test_osd_runs_with_lowered_character_threshold(engine):
+    calls = []
+
+    def osd(img, config="", output_type=None):
+        calls.append(config)
+        return {"script": "Cyrillic", "script_conf": 4.0}
+
+    engine.setattr(pytesseract, "image_to_osd", osd)
+    assert ocr_engine.detect_lang(_crop()) == "rus"
+    assert calls == [f"-c min_characters_to_try={ocr_engine.OSD_MIN_CHARACTERS}"]
+
+
+@pytest.mark.parametrize("text, lang", [("مرحبا بالعالم", "ara"), ("Привет мир", "rus"), ("Je t'attends", "eng+fra")])
+def test_script_is_voted_when_osd_fails(engine, text, lang):
+    def osd(img, config="", output_type=None):
+        raise pytesseract.TesseractError(1, "Too few characters")
+
+    reads = []
+
+    def read(img, lang, config=""):
+        reads.append(lang)
+        return text
+
+    engine.setattr(pytesseract, "image_to_osd", osd)
+    engine.setattr(pytesseract, "image_to_string", read)
+    assert ocr_engine.detect_lang(_crop()) == lang
+    # Lecture de repli avec toutes les langues candidates, pas 'eng' seul
+    assert reads == ["ara+eng+fra+rus"]
+
+
+def test_single_language_set_skips_osd(engine):
+    engine.setattr(ocr_engine, "_installed_langs", {"eng", "osd"})
+
+    def osd(img, config="", output_type=None):
+        raise AssertionError("OSD inutile avec une seule langue")
+
+    engine.setattr(pytesseract, "image_to_osd", osd)
+    assert ocr_engine.detect_lang(_crop()) == "eng"
@@ -0,0 +1,126 @@
+"""
+Tests de HedgedSearch avec des backends simulés (FunctionBackend) : délais maximaux, démarrage anticipé
+du backend secondaire, résultats de la liste noire ignorés, échec de tous les backends, cache des réponses brutes.
+"""
+
+import threading
+import time
+
+from eval_cache import EvalCache
+from search_backends import MAX_THREADS, FunctionBackend, HedgedSearch, backend_stats
+
+GOOD = [{"platform": "YouTube", "title": "Adele - Hello", "url": "https://youtu.be/good"}]
+BLACKLISTED = [{"platform": "YouTube", "title": "Adele - Hello (Official Video)", "url": "https://youtu.be/clip"}]
+
+
+def _fake(results=GOOD, sleep=0.0, error=None, calls=None):
+    # Fonction de recherche simulée : attend, échoue ou retourne des résultats bruts
+    def search(query, api_key=None, max_results=5):
+        if calls is not None:
+            calls.append(query)
+        time.sleep(sleep)
+        if error:
+            raise error
+        return results
+    return search
+
+
+def _stat(name, field):
+    return backend_stats().get(name, {}).get(field, 0)
+
+
+def test_backend_over_its_timeout_is_abandoned():
+    search = HedgedSearch([
+        FunctionBackend("t_slow", _fake(sleep=1.0), timeout=0.1),
+        FunctionBackend("t_backup", _fake(), delay=5.0),
+    ])
+    start = time.monotonic()
+    assert search("hello adele") == GOOD
+    # Le secondaire démarre dès le délai du premier dépassé, sans attendre son retard de 5 s
+    assert time.monotonic() - start < 1.0
+    assert _stat("t_slow", "timeouts") == 1
+    assert _stat("t_backup", "wins") == 1
+
+
+def test_hung_backend_does_not_starve_other_searches():
+    release = threading.Event()
+
+    def hang(query, api_key=None, max_results=5):
+        release.wait(timeout=30)
+        return GOOD
+
+    search = HedgedSearch([
+        FunctionBackend("h_hung", hang, timeout=0.02),
+        FunctionBackend("h_backup", _fake(), delay=5.0),
+    ])
+    healthy = HedgedSearch([FunctionBackend("h_healthy", _fake())])
+    try:
+        start = time.monotonic()
+        # Plus d'appels bloqués que de threads : les suivants ne doivent pas attendre en file
+        for i in range(MAX_THREADS + 4):
+            assert search(f"query {i}") == GOOD
+        assert time.monotonic() - start < 5.0
+        assert _stat("h_hung", "calls") == MAX_THREADS
+        assert _stat("h_hung", "saturated") == 4
+        # Les autres backends ont leurs propres threads
+        assert healthy("hello adele") == GOOD
+    finally:
+        release.set()
+
+
+def test_delayed_secondary_starts_early_when_primary_fails():
+    search = HedgedSearch([
+        FunctionBackend("e_primary", _fake(error=RuntimeError("quota dépassé"))),
+        FunctionBackend("e_secondary", _fake(), delay=5.0),
+    ])
+    start = time.monotonic()
+    assert search("hello adele") == GOOD
+    assert time.monotonic() - start < 1.0
+    assert _stat("e_primary", "errors") == 1
+
+
+def test_delayed_secondary_not_started_when_primary_wins():
+    calls = []
+    search = HedgedSearch([
+        FunctionBackend("w_primary", _fake()),
+        FunctionBackend("w_secondary", _fake(calls=calls), delay=5.0),
+    ])
+    assert search("hello adele") == GOOD
+    assert calls == []
+
+
+def test_blacklisted_result_from_fastest_backend_is_skipped():
+    search = HedgedSearch([
+        FunctionBackend("b_fast", _fake(results=BLACKLISTED)),
+        FunctionBackend("b_slow", _fake(sleep=0.1)),
+    ])
+    assert search("hello adele") == GOOD
+    assert _stat("b_fast", "wins") == 0
+    assert _stat("b_slow", "wins") == 1
+
+
+def test_every_backend_failing_gives_empty_result():
+    search = HedgedSearch([
+        FunctionBackend("f_error", _fake(error=ConnectionError("réseau"))),
+        FunctionBackend("f_timeout", _fake(sleep=1.0), timeout=0.1),
+        FunctionBackend("f_blacklisted", _fake(results=BLACKLISTED), delay=0.05),
+    ])
+    assert search("hello adele") == []
+
+
+def test_cached_raw_response_is_refiltered_without_calling_the_backend(tmp_path):
+    calls = []
+    backend = FunctionBackend("c_network", _fake(calls=calls))
+    backend.cacheable = True
+    search = HedgedSearch([backend], cache=EvalCache(str(tmp_path / "eval_cache.db")))
+    assert search("hello adele") == GOOD
+    assert search("hello adele") == GOOD
+    assert calls == ["hello adele"]
+
+
+def test_non_cacheable_backend_is_always_called(tmp_path):
+    calls = []
+    search = HedgedSearch([FunctionBackend("n_local", _fake(calls=calls))], cache=EvalCache(str(tmp_path / "eval_cache.db")))
+    search("hello adele")
+    search("hello adele")
+    assert len(calls) == 2
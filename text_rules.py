@@ -0,0 +1,115 @@
+"""
+Module text_rules.py
+Moteur unique de filtrage des lignes OCR, partagé par tous les extracteurs.
+
+Chaque source (Shazam, notification Shazam, Apple Music, YouTube, nettoyage générique de l'interface)
+déclare son jeu de règles sous forme de données (RULE_SPECS) : motifs regex ou listes de mots-clés,
+associés à une action :
+- SKIP : la ligne est ignorée, on passe à la suivante
+- STOP : la ligne et tout ce qui suit sont ignorés
+Les motifs sont compilés une seule fois à l'import ; les lignes sont parcourues en une seule passe,
+avec arrêt anticipé dès que le nombre de lignes voulu est atteint.
+Ajouter une source = ajouter une entrée dans RULE_SPECS (ou appeler register_rule_set).
+"""
+
+import re
+from collections import namedtuple
+
+SKIP = "skip"
+STOP = "stop"
+
+# Ligne du nombre de vues YouTube (ex: '241k vues', '1,2 M views')
+VIEWS_PATTERN = re.compile(r'[0-9][0-9\., kKmM]*\s*(vues|views)', re.IGNORECASE)
+
+# Mots-clés de l'interface (YouTube, Apple Music, Shazam...) à ignorer, liste à ajuster selon les apps
+UI_KEYWORDS = [
+    "vues", "commentaire", "abonné", "s'abonner", "partager", "remixer",
+    "clip", "télécharger", "sponsorisé", "apple music", "soundcloud",
+    "like", "comment", "notifications", "publicité", "minutes", "heures",
+    "stream", "plus", "...", "abonnés", "partage", "remix",
+    "titres de l’artiste", "voir plus", "ouvrir dans apple music", "s’abonner",
+    "commentaires", "nv", "commander", "téléchargement",
+]
+
+# Règles communes aux écrans Shazam / Apple Music : tout s'arrête au premier nombre ou copyright
+_UNTIL_DIGIT_OR_COPYRIGHT = [(STOP, {"regex": r"[\d©]"})]
+
+# Déclaration des jeux de règles par source :
+#   "rules": liste de (action, {"regex": motif} ou {"keywords": [...]})
+#   "max_lines": nombre maximal de lignes gardées (arrêt anticipé)
+#   "min_length": longueur minimale d'une ligne gardée (après strip)
+RULE_SPECS = {
+    "shazam": {"rules": _UNTIL_DIGIT_OR_COPYRIGHT, "max_lines": 2},
+    "shazam_notif": {"rules": _UNTIL_DIGIT_OR_COPYRIGHT, "max_lines": 2},
+    "apple_music": {"rules": _UNTIL_DIGIT_OR_COPYRIGHT, "max_lines": 2},
+    "youtube": {
+        "rules": [(STOP, {"regex": VIEWS_PATTERN.pattern}), (SKIP, {"regex": r"©|^\d+$"})],
+        "max_lines": 2,
+    },
+    "youtube_fallback": {"rules": [(SKIP, {"regex": r"©|^\d+$"})], "max_lines": 2},
+    "ui_cleanup": {"rules": [(SKIP, {"keywords": UI_KEYWORDS})], "max_lines": 2, "min_length": 9},
+    # Validité d'un crop dans la cascade : pas de longueur minimale (titres courts comme 'Hello' / 'Adele')
+    "cascade": {"rules": [(SKIP, {"keywords": UI_KEYWORDS})], "max_lines": 2},
+}
+
+RuleSet = namedtuple("RuleSet", ["rules", "max_lines", "min_length"])
+
+
+def _compile(matcher):
+    # Une liste de mots-clés devient une seule alternation, insensible à la casse
+    if "keywords" in matcher:
+        return re.compile("|".join(re.escape(k) for k in matcher["keywords"]), re.IGNORECASE)
+    return re.compile(matcher["regex"], re.IGNORECASE if matcher.get("ignorecase", True) else 0)
+
+
+def compile_rule_set(spec):
+    """Compile une déclaration de règles (voir RULE_SPECS) en RuleSet prêt à l'emploi."""
+    return RuleSet(
+        rules=tuple((action, _compile(matcher)) for action, matcher in spec["rules"]),
+        max_lines=spec.get("max_lines"),
+        min_length=spec.get("min_length", 1),
+    )
+
+
+RULE_SETS = {name: compile_rule_set(spec) for name, spec in RULE_SPECS.items()}
+
+
+def register_rule_set(name, rules, max_lines=None, min_length=1):
+    """Déclare (ou remplace) le jeu de règles d'une nouvelle source."""
+    spec = {"rules": rules, "max_lines": max_lines, "min_length": min_length}
+    RULE_SPECS[name] = spec
+    RULE_SETS[name] = compile_rule_set(spec)
+
+
+def filter_lines(text, rule_set):
+    """
+    Filtre les lignes OCR selon un jeu de règles, en une seule passe.
+
+    Args:
+        text (str ou list): Texte OCR brut ou liste de lignes.
+        rule_set (str ou RuleSet): Nom d'un jeu de RULE_SETS ou RuleSet compilé.
+
+    Returns:
+        list: Lignes gardées (strippées), au plus rule_set.max_lines.
+    """
+    if isinstance(rule_set, str):
+        rule_set = RULE_SETS[rule_set]
+    lines = text.splitlines() if isinstance(text, str) else text
+    kept = []
+    for raw in lines:
+        line = raw.strip()
+        if not line:
+            continue
+        action = None
+        for rule_action, pattern in rule_set.rules:
+            if pattern.search(line):
+                action = rule_action
+                break
+        if action == STOP:
+            break
+        if action == SKIP or len(line) < rule_set.min_length:
+            continue
+        kept.append(line)
+        if rule_set.max_lines and len(kept) == rule_set.max_lines:
+            break
+    return kept
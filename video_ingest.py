@@ -0,0 +1,123 @@
+"""
+Module video_ingest.py
+Ingestion des enregistrements d'écran (vidéos) : échantillonnage de frames et détection de changement.
+
+Au lieu de passer chaque frame dans la pipeline, on échantillonne la vidéo (par défaut 2 frames/s),
+on compare une miniature de la seule zone titre/artiste donnée par get_crop_box (différence
+de frames à faible coût), et on ne lance l'OCR que lorsque cette zone a changé puis s'est stabilisée.
+Les textes déjà vus sont ignorés : on obtient un résultat par morceau distinct.
+"""
+
+import os
+
+import cv2
+
+from detect_source_type import get_device_and_orientation, detect_source_type
+from frame_image import FrameImage
+from where_to_crop import get_crop_box
+
+# Extensions de vidéos acceptées par la pipeline
+VIDEO_EXTENSIONS = ('.mp4', '.mov', '.m4v')
+
+# Intervalle d'échantillonnage par défaut (millisecondes)
+SAMPLE_MS = 500
+# Taille de la miniature (largeur, hauteur) de la zone titre comparée d'un échantillon à l'autre
+THUMB_SIZE = (128, 64)
+# Écart de niveau de gris (0-255) à partir duquel un pixel de la miniature est considéré comme modifié
+PIXEL_DELTA = 40
+# Fraction de pixels modifiés au-delà de laquelle la zone titre a changé depuis le dernier OCR
+CHANGE_THRESHOLD = 0.005
+# Fraction maximale de pixels modifiés entre deux échantillons consécutifs pour une zone stable
+STABLE_THRESHOLD = 0.001
+
+
+def region_thumbnail(frame, box):
+    """Miniature en niveaux de gris de la zone `box` d'une frame BGR."""
+    left, top, right, bottom = box
+    gray = cv2.cvtColor(frame[top:bottom, left:right], cv2.COLOR_BGR2GRAY)
+    return cv2.resize(gray, THUMB_SIZE, interpolation=cv2.INTER_AREA)
+
+
+def region_change(a, b):
+    """Fraction des pixels de deux miniatures dont le niveau diffère de plus de PIXEL_DELTA."""
+    return float((cv2.absdiff(a, b) > PIXEL_DELTA).mean())
+
+
+def iter_sampled_frames(video_path, sample_ms=SAMPLE_MS):
+    """
+    Parcourt une vidéo en ne décodant complètement qu'une frame toutes les `sample_ms` millisecondes
+    (grab() pour les frames sautées, retrieve() seulement pour les frames échantillonnées).
+
+    Yields:
+        tuple: (timestamp en secondes, frame BGR (H, W, 3))
+    """
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise IOError(f"Impossible d'ouvrir la vidéo : {video_path}")
+    try:
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        step = max(1, int(round(fps * sample_ms / 1000.0)))
+        index = 0
+        while cap.grab():
+            if index % step == 0:
+                ok, frame = cap.retrieve()
+                if not ok:
+                    break
+                yield index / fps, frame
+            index += 1
+    finally:
+        cap.release()
+
+
+def _normalize(text):
+    return " ".join(text.lower().split())
+
+
+def extract_video_text(video_path, ocr_frame, sample_ms=SAMPLE_MS):
+    """
+    Extrait un texte par morceau distinct d'un enregistrement d'écran.
+
+    Args:
+        video_path (str): Chemin de la vidéo.
+        ocr_frame (callable): Fonction (nom, device_info, FrameImage) -> texte, ex: main.process_image.
+        sample_ms (int): Intervalle d'échantillonnage en millisecondes.
+
+    Returns:
+        list: Liste de {"image", "device_type", "extracted_text"} (image = 'video.mov@12.5s').
+    """
+    filename = os.path.basename(video_path)
+    root, _ = os.path.splitext(filename)
+    source = detect_source_type(video_path)
+    rows = []
+    seen = set()
+    device_info = crop_box = None
+    previous = last_ocr = None
+    for t, frame in iter_sampled_frames(video_path, sample_ms):
+        if device_info is None:
+            # Device, orientation et zone de crop sont fixés par la première frame
+            h, w = frame.shape[:2]
+            device, orientation = get_device_and_orientation(w, h)
+            device_info = {"device": device, "orientation": orientation.replace("_split", ""), "source": source}
+            crop_box = get_crop_box(FrameImage(frame), filename, device_type=device_info) or (0, 0, w, h // 2)
+            print(f"[LOG] {video_path} | resolution: {w}x{h} | device: {device}, orientation: {orientation}, source: {source}")
+        current = region_thumbnail(frame, crop_box)
+        # La zone doit être stable (pas en pleine transition) et différente de la dernière zone lue
+        stable = previous is not None and region_change(current, previous) <= STABLE_THRESHOLD
+        changed = last_ocr is None or region_change(current, last_ocr) > CHANGE_THRESHOLD
+        previous = current
+        if not (stable and changed):
+            continue
+        last_ocr = current
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        text = ocr_frame(f"{root}_{t:.1f}s.png", device_info, FrameImage(rgb))
+        key = _normalize(text)
+        if not key or key in seen:
+            continue
+        seen.add(key)
+        print(f"Texte extrait ({t:.1f}s) : {text}")
+        rows.append({
+            "image": f"{filename}@{t:.1f}s",
+            "device_type": f"{device_info['device']} {device_info['orientation']} {source}",
+            "extracted_text": text,
+        })
+    return rows
@@ -1,5 +1,6 @@
-from PIL import Image
 import os
+from text_rules import filter_lines
+from lazy_image import LazyImage
 
 def get_crop_box(img, filename, device_type=None):
     w, h = img.size
@@ -123,41 +124,25 @@ def get_crop_box(img, filename, device_type=None):
 
 
 def clean_ocr_lines(lines):
-    # Liste à ajuster selon les apps !
-    ignore_keywords = [
-        "vues", "commentaire", "abonné", "s'abonner", "partager", "remixer",
-        "clip", "télécharger", "sponsorisé", "apple music", "soundcloud",
-        "like", "comment", "notifications", "publicité", "minutes", "heures",
-        "stream", "plus", "...", "abonnés", "partage", "remix", "remixer",
-        "titres de l’artiste", "voir plus", "ouvrir dans apple music", "s’abonner",
-        "commentaires", "s’abonner", "nv", "clip", "commander", "téléchargement", "sponsorisé"
-    ]
-    cleaned = []
-    for line in lines:
-        l = line.lower()
-        if not line.strip(): continue
-        if any(k in l for k in ignore_keywords): continue
-        # Ignore lignes très courtes
-        if len(line.strip()) < 3: continue
-        cleaned.append(line)
-    # Ne garder que les 2 premières lignes non polluées (optionnel)
-    cleaned = [l for l in cleaned if len(l) > 8][:2]
-    return cleaned
+    # Règles (mots-clés d'interface à ignorer, longueur minimale, 2 lignes max) déclarées dans text_rules.RULE_SPECS["ui_cleanup"]
+    return filter_lines(lines, "ui_cleanup")
 
-def ocr_and_clean(img, lang='eng'):
-    import pytesseract
-    raw_text = pytesseract.image_to_string(img, lang=lang)
+def ocr_and_clean(img, lang=None):
+    from ocr_engine import ocr_image
+    # lang=None : langue choisie automatiquement selon le script détecté sur le crop
+    raw_text = ocr_image(img, lang=lang)
     lines = raw_text.split('\n')
     best = clean_ocr_lines(lines)
     # Retourne une seule ligne (titre + artiste), ou vide si rien trouvé
     return " – ".join(best) if best else ""
 
 def crop_for_ocr(image_path, device_type=None):
-    img = Image.open(image_path)
+    # Seules les lignes jusqu'au bas du crop sont décodées
+    img = LazyImage(image_path)
     crop_box = get_crop_box(img, os.path.basename(image_path), device_type=device_type)
     if crop_box:
         return img.crop(crop_box)
-    return img
+    return img.materialize()
 
 # EXEMPLE D’UTILISATION
 if __name__ == "__main__":